@@ -4,7 +4,9 @@ Labour Wage Prediction API - Main Application
 
 from flask import Flask
 from flask_cors import CORS
-from config import DEBUG, PORT
+from compression import compress_response
+from config import DEBUG, PORT, COMPRESS_ENABLED
+from fastjson import json_provider_class
 from models import initialize_models
 from routes import api
 
@@ -12,8 +14,11 @@ from routes import api
 def create_app():
     """Create and configure Flask app"""
     app = Flask(__name__)
+    app.json = json_provider_class()(app)
     CORS(app)
     app.register_blueprint(api)
+    if COMPRESS_ENABLED:
+        app.after_request(compress_response)
     return app
 
 app = create_app()
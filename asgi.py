@@ -0,0 +1,178 @@
+"""
+ASGI serving mode for the Labour Wage Prediction API
+
+    uvicorn asgi:app --workers 4
+
+Request bodies are received on the event loop, so slow mobile clients do
+not hold a thread while they upload. The existing Flask routes (routes.py)
+then run on a bounded thread pool. Requests beyond the pool size plus
+ASGI_MAX_QUEUE waiting requests get an immediate 503 with Retry-After
+instead of queueing without limit.
+
+Bodies are buffered up to ASGI_MAX_BODY_BYTES; very large streaming uploads
+(/api/predict/stream) are better served by the WSGI server.
+"""
+
+import asyncio
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from app import app as flask_app
+from config import ASGI_INFERENCE_THREADS, ASGI_MAX_QUEUE, ASGI_RETRY_AFTER, ASGI_MAX_BODY_BYTES
+from metrics import Counter, register
+
+# Cheap endpoints answered even when the inference pool is saturated
+UNTHROTTLED_PATHS = {'/health', '/metrics'}
+
+REJECTED = register(Counter(
+    'wage_asgi_rejected_total',
+    'Requests rejected with 503 because the inference queue was full',
+    ['path']
+))
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its fully received body"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    
+    return environ
+
+def start_wsgi(environ):
+    """
+    Call the Flask app up to the point where it has started its response.
+    Returns: (status, headers, written_chunks, body_iterable)
+    """
+    captured = {'written': []}
+    
+    def start_response(status, headers, exc_info=None):
+        captured['status'] = int(status.split(' ', 1)[0])
+        captured['headers'] = headers
+        return captured['written'].append
+    
+    iterable = flask_app(environ, start_response)
+    return captured['status'], captured['headers'], captured['written'], iterable
+
+class AsgiApp:
+    """ASGI front end with a bounded inference pool and admission control"""
+    
+    def __init__(self, threads=ASGI_INFERENCE_THREADS, max_queue=ASGI_MAX_QUEUE):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='inference')
+        self.capacity = threads + max_queue
+        self.inflight = 0
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+    
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def http(self, scope, receive, send):
+        # Receive the whole body on the event loop, without tying up a thread
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if len(body) > ASGI_MAX_BODY_BYTES:
+                await self.send_json(send, 413, {'error': 'Request body too large'})
+                return
+            if not message.get('more_body'):
+                break
+        
+        environ = build_environ(scope, bytes(body))
+        if scope['path'] in UNTHROTTLED_PATHS:
+            await self.respond(send, *start_wsgi(environ), loop=None)
+            return
+        
+        # Fail fast instead of letting queueing latency grow without bound
+        if self.inflight >= self.capacity:
+            REJECTED.inc(scope['path'])
+            await self.send_json(send, 503, {'error': 'Server overloaded, retry later'},
+                                 [(b'retry-after', str(ASGI_RETRY_AFTER).encode())])
+            return
+        
+        self.inflight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, start_wsgi, environ)
+            await self.respond(send, *result, loop=loop)
+        finally:
+            self.inflight -= 1
+    
+    async def respond(self, send, status, headers, written, iterable, loop):
+        body_iter = iter(iterable)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+        })
+        try:
+            for chunk in written:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            while True:
+                # Streaming responses produce their chunks on the pool
+                if loop is None:
+                    chunk = next(body_iter, None)
+                else:
+                    chunk = await loop.run_in_executor(self.executor, next, body_iter, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+    
+    @staticmethod
+    async def send_json(send, status, payload, extra_headers=()):
+        body = json.dumps(payload).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()), *extra_headers]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+app = AsgiApp()
@@ -0,0 +1,174 @@
+"""
+Asynchronous prediction audit log: a bounded in-memory queue drained by a
+background writer into rotating gzip-compressed NDJSON files
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from background import ProcessThread, process_batches
+from config import (
+    AUDIT_ENABLED, AUDIT_DIR, AUDIT_MAX_QUEUE, AUDIT_FULL_POLICY, AUDIT_BLOCK_TIMEOUT,
+    AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL, AUDIT_ROTATE_BYTES, AUDIT_ROTATE_SECONDS
+)
+
+# What submit does when the queue is full
+AUDIT_POLICIES = ('drop', 'block')
+
+class AuditSink:
+    """
+    Buffers audit records and writes them in batches off the request path.
+    When the queue is full, records are dropped (policy 'drop') or the caller
+    waits up to block_timeout seconds for room (policy 'block').
+    Files rotate once they reach rotate_bytes or are rotate_seconds old.
+    """
+    
+    def __init__(self, directory, max_queue=10000, policy='drop', block_timeout=1.0,
+                 batch_size=500, flush_interval=1.0, rotate_bytes=64 << 20, rotate_seconds=3600):
+        if policy not in AUDIT_POLICIES:
+            raise ValueError(f"Unknown audit queue policy '{policy}'. Choose from {list(AUDIT_POLICIES)}")
+        self.directory = directory
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = ProcessThread(self._run, 'audit-writer', on_start=self._new_file)
+        self._file_path = None
+        self._file_opened_at = 0.0
+        self._file_sequence = 0
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.write_errors = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.last_flush_ms = 0.0
+    
+    def submit(self, record):
+        """Queue one audit record. Returns False if it was dropped."""
+        self.start()
+        try:
+            if self.policy == 'block':
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        
+        with self._lock:
+            self.submitted += 1
+        return True
+    
+    def start(self):
+        """Start this process's writer thread if it is not running yet"""
+        self._writer.start()
+    
+    def _new_file(self):
+        # A forked child starts with its own, empty file
+        self._file_path = None
+    
+    def _run(self):
+        process_batches(self._queue, self.flush, self.batch_size, self.flush_interval)
+    
+    def drain(self):
+        """Write everything still queued (used at exit)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.flush(batch)
+    
+    def current_file(self):
+        """Path to write the next batch to, rotating by size and age"""
+        now = time.time()
+        path = self._file_path
+        if path is not None:
+            too_old = now - self._file_opened_at >= self.rotate_seconds
+            too_big = os.path.exists(path) and os.path.getsize(path) >= self.rotate_bytes
+            if not (too_old or too_big):
+                return path
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._file_sequence += 1
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))
+        self._file_path = os.path.join(
+            self.directory, f'audit-{stamp}-{os.getpid()}-{self._file_sequence:04d}.ndjson.gz'
+        )
+        self._file_opened_at = now
+        return self._file_path
+    
+    def flush(self, batch):
+        """Append a batch as one gzip member (concatenated members read as one stream)"""
+        start = time.perf_counter()
+        lines = ''.join(json.dumps(record, separators=(',', ':'), default=str) + '\n' for record in batch)
+        try:
+            with self._write_lock, gzip.open(self.current_file(), 'at', encoding='utf-8') as f:
+                f.write(lines)
+            written, errors = len(batch), 0
+        except OSError:
+            written, errors = 0, len(batch)
+        
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.written += written
+            self.write_errors += errors
+            self.flushes += 1
+            self.flush_seconds += elapsed
+            self.last_flush_ms = elapsed * 1000
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': True,
+                'policy': self.policy,
+                'queue_depth': self._queue.qsize(),
+                'max_queue': self._queue.maxsize,
+                'submitted': self.submitted,
+                'dropped': self.dropped,
+                'written': self.written,
+                'write_errors': self.write_errors,
+                'flushes': self.flushes,
+                'last_flush_ms': round(self.last_flush_ms, 3),
+                'mean_flush_ms': round(self.flush_seconds / self.flushes * 1000, 3) if self.flushes else 0.0,
+                'current_file': self._file_path
+            }
+
+# Process-wide sink, None unless auditing is enabled
+sink = AuditSink(
+    AUDIT_DIR, AUDIT_MAX_QUEUE, AUDIT_FULL_POLICY, AUDIT_BLOCK_TIMEOUT,
+    AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL, AUDIT_ROTATE_BYTES, AUDIT_ROTATE_SECONDS
+) if AUDIT_ENABLED else None
+
+if sink is not None:
+    atexit.register(sink.drain)
+
+def audit_prediction(bundle, data, row, prediction):
+    """Queue one prediction for the audit log; a no-op when auditing is disabled"""
+    if sink is None:
+        return
+    sink.submit({
+        'ts': time.time(),
+        'sector': bundle.sector,
+        'model_version': bundle.version,
+        'input': data,
+        'encoded': list(row),
+        'prediction': prediction
+    })
+
+def audit_stats():
+    """Queue depth, throughput and flush latency of the audit sink"""
+    return sink.stats() if sink is not None else {'enabled': False}
@@ -0,0 +1,241 @@
+"""
+Pluggable predictor backends: compile a sector's tree ensemble into an
+alternative runtime and keep it only if it matches XGBoost on a test set
+
+    xgboost   Booster.inplace_predict (the reference)
+    numpy     flattened trees evaluated level by level with numpy
+    treelite  trees compiled to a shared library with treelite + tl2cgen
+    onnx      trees converted with onnxmltools, run by ONNX Runtime on CPU
+"""
+
+import json
+import os
+import numpy as np
+
+BACKENDS = ('xgboost', 'numpy', 'treelite', 'onnx')
+
+# Objectives whose prediction is the raw margin (no link function)
+IDENTITY_OBJECTIVES = {'reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror', 'reg:quantileerror'}
+
+def ensemble_config(booster):
+    """Learner configuration needed to evaluate the trees outside XGBoost, or None if unsupported"""
+    learner = json.loads(booster.save_config())['learner']
+    gbm = learner['gradient_booster']
+    if gbm['name'] != 'gbtree' or learner['objective']['name'] not in IDENTITY_OBJECTIVES:
+        return None
+    if int(learner['learner_model_param'].get('num_target', 1)) != 1:
+        return None
+    
+    return {
+        'base_score': float(learner['learner_model_param']['base_score'].strip('[]')),
+        'num_parallel_tree': int(gbm.get('gbtree_model_param', {}).get('num_parallel_tree', 1))
+    }
+
+class FlatForest:
+    """
+    All trees of an ensemble flattened into parallel node arrays.
+    Leaves point back to themselves with an infinite threshold, so every
+    row can take max_depth steps through every tree with no branching.
+    """
+    
+    def __init__(self, roots, feature, threshold, left, right, default, value, max_depth, base_score):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default = default
+        self.value = value
+        self.max_depth = max_depth
+        self.base_score = base_score
+    
+    def predict(self, matrix):
+        X = np.asarray(matrix, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.tile(self.roots, (len(X), 1))
+        
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            step = np.where(x < self.threshold[node], self.left[node], self.right[node])
+            node = np.where(np.isnan(x), self.default[node], step)
+        
+        # Add leaves one tree at a time in float32 after the base score, as
+        # XGBoost does (cumsum is sequential, unlike the pairwise np.sum)
+        leaves = np.empty((len(X), len(self.roots) + 1), dtype=np.float32)
+        leaves[:, 0] = self.base_score
+        leaves[:, 1:] = self.value[node]
+        return np.cumsum(leaves, axis=1)[:, -1]
+
+def flatten_trees(booster, n_features, best_iteration=None):
+    """
+    Build a FlatForest from a booster's JSON dump.
+    Returns None for ensembles it cannot evaluate exactly (categorical
+    splits, non-tree boosters, objectives with a link function).
+    """
+    config = ensemble_config(booster)
+    if config is None:
+        return None
+    
+    dumps = booster.get_dump(dump_format='json')
+    if best_iteration is not None:
+        dumps = dumps[:(best_iteration + 1) * config['num_parallel_tree']]
+    
+    names = booster.feature_names or [f'f{i}' for i in range(n_features)]
+    feature_index = {name: i for i, name in enumerate(names)}
+    
+    feature, threshold, left, right, default, value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    
+    for dump in dumps:
+        # Collect the tree's nodes, then lay them out after the previous trees
+        nodes, stack = [], [(json.loads(dump), 0)]
+        while stack:
+            node, depth = stack.pop()
+            nodes.append(node)
+            max_depth = max(max_depth, depth)
+            stack.extend((child, depth + 1) for child in node.get('children', []))
+        
+        offset = len(feature)
+        position = {node['nodeid']: offset + i for i, node in enumerate(nodes)}
+        roots.append(position[0])
+        
+        for i, node in enumerate(nodes):
+            index = offset + i
+            if 'leaf' in node:
+                feature.append(0)
+                threshold.append(np.inf)
+                left.append(index)
+                right.append(index)
+                default.append(index)
+                value.append(node['leaf'])
+                continue
+            
+            condition = node.get('split_condition')
+            if not isinstance(condition, (int, float)) or node['split'] not in feature_index:
+                return None
+            feature.append(feature_index[node['split']])
+            threshold.append(condition)
+            left.append(position[node['yes']])
+            right.append(position[node['no']])
+            default.append(position[node['missing']])
+            value.append(0.0)
+    
+    return FlatForest(
+        np.asarray(roots, dtype=np.int32),
+        np.asarray(feature, dtype=np.int32),
+        np.asarray(threshold, dtype=np.float32),
+        np.asarray(left, dtype=np.int32),
+        np.asarray(right, dtype=np.int32),
+        np.asarray(default, dtype=np.int32),
+        np.asarray(value, dtype=np.float32),
+        max_depth,
+        config['base_score']
+    )
+
+def compile_numpy(model, n_features, build_dir, build_key):
+    forest = flatten_trees(model.get_booster(), n_features, getattr(model, 'best_iteration', None))
+    if forest is None:
+        raise ValueError('Ensemble cannot be flattened (needs gbtree, numeric splits and an identity objective)')
+    return forest.predict
+
+def compile_treelite(model, n_features, build_dir, build_key):
+    import tl2cgen
+    import treelite
+    
+    # Compile once per model version; later loads reuse the shared library
+    libpath = os.path.join(build_dir, f'{build_key}.so')
+    if not os.path.exists(libpath):
+        os.makedirs(build_dir, exist_ok=True)
+        tl_model = treelite.frontend.from_xgboost(model.get_booster())
+        tl2cgen.export_lib(tl_model, toolchain='gcc', libpath=libpath, params={'parallel_comp': os.cpu_count() or 1})
+    predictor = tl2cgen.Predictor(libpath, nthread=1)
+    
+    def predict(matrix):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        return predictor.predict(tl2cgen.DMatrix(matrix, dtype='float32')).reshape(len(matrix), -1)[:, 0]
+    
+    return predict
+
+def compile_onnx(model, n_features, build_dir, build_key):
+    import onnxruntime
+    from onnxmltools import convert_xgboost
+    from onnxmltools.convert.common.data_types import FloatTensorType
+    
+    # The converter expects positional feature names (f0, f1, ...)
+    booster = model.get_booster().copy()
+    booster.feature_names = None
+    booster.feature_types = None
+    onnx_model = convert_xgboost(booster, initial_types=[('input', FloatTensorType([None, n_features]))])
+    
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = 1
+    session = onnxruntime.InferenceSession(
+        onnx_model.SerializeToString(), options, providers=['CPUExecutionProvider']
+    )
+    
+    def predict(matrix):
+        return session.run(None, {'input': np.asarray(matrix, dtype=np.float32)})[0].ravel()
+    
+    return predict
+
+COMPILERS = {
+    'numpy': compile_numpy,
+    'treelite': compile_treelite,
+    'onnx': compile_onnx
+}
+
+def check_rows(n_features, lookups, ranges, features, n_rows=1000, seed=0):
+    """Generated feature rows: every categorical code and numbers spread across their ranges"""
+    rng = np.random.default_rng(seed)
+    matrix = np.empty((n_rows, n_features), dtype=np.float32)
+    for j, col in enumerate(features):
+        table = lookups.get(col)
+        if table is not None:
+            matrix[:, j] = rng.integers(0, max(1, len(table['classes'])), n_rows)
+        else:
+            low, high = ranges.get(col, (None, None))
+            low = 0 if low is None else low
+            high = low + 100 if high is None else high
+            matrix[:, j] = rng.uniform(low, high, n_rows)
+    return matrix
+
+def max_difference(predict, reference, matrix):
+    """Largest absolute difference between two predict functions on a matrix"""
+    return float(np.max(np.abs(
+        np.asarray(predict(matrix), dtype=np.float64) - np.asarray(reference(matrix), dtype=np.float64)
+    )))
+
+def select_backend(name, model, reference, check_matrix, tolerance, build_dir, build_key, max_rows=0):
+    """
+    Compile the configured backend and verify it against the XGBoost reference.
+    Falls back to the reference when the backend is unavailable, fails to
+    compile or differs by more than tolerance on the check matrix.
+    With max_rows, larger matrices still go to the reference.
+    Returns: (predict_fn, info)
+    """
+    if name == 'xgboost' or reference is None:
+        return reference, {'backend': 'xgboost' if reference else 'dataframe'}
+    
+    try:
+        if name not in COMPILERS:
+            raise ValueError(f"Unknown predictor backend '{name}'. Choose from {list(BACKENDS)}")
+        predict = COMPILERS[name](model, check_matrix.shape[1], build_dir, build_key)
+        difference = max_difference(predict, reference, check_matrix)
+    except Exception as e:
+        return reference, {'backend': 'xgboost', 'requested': name, 'error': str(e)}
+    
+    if not difference <= tolerance:
+        return reference, {
+            'backend': 'xgboost', 'requested': name,
+            'error': f'Max abs difference {difference:.3g} exceeds tolerance {tolerance}'
+        }
+    info = {'backend': name, 'max_abs_diff': difference, 'tolerance': tolerance}
+    if max_rows > 0:
+        compiled = predict
+        
+        def predict(matrix):
+            return compiled(matrix) if len(matrix) <= max_rows else reference(matrix)
+        
+        info['max_rows'] = max_rows
+    
+    return predict, info
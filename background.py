@@ -0,0 +1,57 @@
+"""
+Background threads that run once in every process
+
+Threads do not survive fork, so a preloading gunicorn master's threads are
+missing in its workers; each process starts its own on first use.
+"""
+
+import os
+import queue
+import threading
+import time
+
+class ProcessThread:
+    """
+    A daemon thread running target(*args), started at most once per process.
+    on_start, if given, runs before the thread starts in a new process
+    (e.g. to drop state inherited from the parent).
+    """
+    
+    def __init__(self, target, name, on_start=None):
+        self.target = target
+        self.name = name
+        self.on_start = on_start
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def start(self, *args):
+        """Start the thread unless this process already has one. Returns True if started."""
+        if self._pid == os.getpid():
+            return False
+        
+        with self._lock:
+            if self._pid == os.getpid():
+                return False
+            if self.on_start is not None:
+                self.on_start()
+            threading.Thread(target=self.target, args=args, name=self.name, daemon=True).start()
+            self._pid = os.getpid()
+        return True
+
+def process_batches(q, handle, batch_size, flush_interval):
+    """
+    Forever take items from queue q and call handle(batch): a batch is sent
+    once it has batch_size items or flush_interval seconds after its first item
+    """
+    while True:
+        batch = [q.get()]
+        deadline = time.monotonic() + flush_interval
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        handle(batch)
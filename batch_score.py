@@ -0,0 +1,193 @@
+"""
+Offline parallel batch scoring
+
+    python batch_score.py workers.csv --sector construction --workers 8 -o scored.csv
+    python batch_score.py history.parquet --sector agriculture --scaling
+
+Input and output may be CSV, JSONL or Parquet (Parquet needs pyarrow).
+The input is split into chunks scored by a process pool; each worker loads
+the sector model once and results are written in input order.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import time
+
+RESULT_FIELDS = ['index', 'success', 'predicted_wage', 'monthly_estimate', 'annual_estimate', 'error']
+
+# Per-process state set up by init_worker
+_worker = {}
+
+def file_format(path):
+    """csv, jsonl or parquet from a file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    return 'csv'
+
+def read_chunks(path, chunk_size):
+    """Yield lists of record dicts from a CSV, JSONL or Parquet file"""
+    import pandas as pd
+    
+    fmt = file_format(path)
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit('Reading Parquet needs pyarrow: pip install pyarrow')
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+    
+    if fmt == 'jsonl':
+        readers = pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        readers = pd.read_csv(path, chunksize=chunk_size)
+    for df in readers:
+        yield df.to_dict('records')
+
+class ResultWriter:
+    """Write scored rows to CSV, JSONL or Parquet in the order they are given"""
+    
+    def __init__(self, path, id_column=None):
+        self.path = path
+        self.format = file_format(path)
+        self.fields = ([id_column] if id_column else []) + RESULT_FIELDS
+        self._parquet = None
+        if self.format == 'csv':
+            self._file = open(path, 'w', newline='')
+            self._csv = csv.DictWriter(self._file, fieldnames=self.fields, extrasaction='ignore')
+            self._csv.writeheader()
+        elif self.format == 'jsonl':
+            self._file = open(path, 'w')
+    
+    def write(self, results):
+        if self.format == 'csv':
+            self._csv.writerows(results)
+        elif self.format == 'jsonl':
+            self._file.writelines(json.dumps(r) + '\n' for r in results)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pylist([{f: r.get(f) for f in self.fields} for r in results])
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+    
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self.format in ('csv', 'jsonl'):
+            self._file.close()
+
+def init_worker(sector, threads_per_worker):
+    """Load the sector model once per worker process"""
+    from models import get_bundle
+    
+    bundle = get_bundle(sector)
+    if bundle is None:
+        raise RuntimeError(f"Sector '{sector}' model could not be loaded")
+    
+    # Several processes each running a full XGBoost thread pool oversubscribe the cores
+    if hasattr(bundle.model, 'get_booster'):
+        bundle.model.get_booster().set_param({'nthread': threads_per_worker})
+    _worker['bundle'] = bundle
+
+def score_chunk(task):
+    """Score one (offset, records, id_column) chunk inside a worker"""
+    from predictor import predict_records
+    
+    offset, records, id_column = task
+    results = predict_records(_worker['bundle'], records, index_offset=offset)
+    if id_column:
+        for record, result in zip(records, results):
+            result[id_column] = record.get(id_column)
+    return results
+
+def worker_ready(_):
+    """No-op task used to wait until the pool's workers have loaded the model"""
+    return os.getpid()
+
+def tasks(path, chunk_size, id_column):
+    offset = 0
+    for records in read_chunks(path, chunk_size):
+        yield offset, records, id_column
+        offset += len(records)
+
+def score_file(path, sector, workers, chunk_size, output=None, id_column=None, threads_per_worker=1):
+    """
+    Score an input file with a pool of worker processes.
+    Returns: (rows, failed_rows, seconds)
+    """
+    writer = ResultWriter(output, id_column) if output else None
+    rows = failed = 0
+    
+    # spawn: workers must not inherit a parent that may already have started
+    # XGBoost's OpenMP threads, and each loads the model exactly once anyway
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=init_worker, initargs=(sector, threads_per_worker)) as pool:
+        # Workers are warm before timing the scoring itself
+        pool.map(worker_ready, range(workers))
+        start = time.perf_counter()
+        for results in pool.imap(score_chunk, tasks(path, chunk_size, id_column)):
+            rows += len(results)
+            failed += sum(1 for r in results if not r['success'])
+            if writer:
+                writer.write(results)
+    elapsed = time.perf_counter() - start
+    
+    if writer:
+        writer.close()
+    return rows, failed, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline parallel wage scoring')
+    parser.add_argument('input', help='CSV, JSONL or Parquet file of worker records')
+    parser.add_argument('--sector', required=True)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--id-column', help='Input column copied to each output row')
+    parser.add_argument('-o', '--output', help='Output file (.csv, .jsonl or .parquet)')
+    parser.add_argument('--scaling', action='store_true',
+                        help='Score with 1, 2, 4, ... up to the core count and compare rows/s')
+    args = parser.parse_args()
+    sector = args.sector.lower().strip()
+    
+    # Check in the parent: a failing pool initializer would be retried forever
+    from models import available_sectors
+    if sector not in available_sectors():
+        parser.error(f"Sector '{sector}' not available. Available: {available_sectors()}")
+    
+    if args.scaling:
+        counts, n = [], 1
+        while n < os.cpu_count():
+            counts.append(n)
+            n *= 2
+        counts.append(os.cpu_count())
+        
+        baseline = None
+        print(f"{'workers':>8} {'rows':>10} {'seconds':>9} {'rows/s':>11} {'speedup':>8}")
+        for workers in counts:
+            rows, _, seconds = score_file(args.input, sector, workers, args.chunk_size,
+                                          threads_per_worker=args.threads_per_worker)
+            rate = rows / seconds if seconds else 0.0
+            baseline = baseline or rate
+            print(f"{workers:>8} {rows:>10} {seconds:>9.2f} {rate:>11.0f} {rate / baseline:>7.2f}x")
+        return
+    
+    rows, failed, seconds = score_file(
+        args.input, sector, args.workers, args.chunk_size,
+        args.output, args.id_column, args.threads_per_worker
+    )
+    rate = rows / seconds if seconds else 0.0
+    print(f"Scored {rows} rows ({failed} failed) with {args.workers} workers "
+          f"in {seconds:.2f}s: {rate:.0f} rows/s")
+
+if __name__ == '__main__':
+    main()
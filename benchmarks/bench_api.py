@@ -0,0 +1,188 @@
+"""
+Load-testing and latency benchmark for the prediction API
+
+    python benchmarks/bench_api.py                          # in-process + gunicorn
+    python benchmarks/bench_api.py --targets inprocess --concurrency 1 4 16
+    python benchmarks/bench_api.py --compare benchmarks/results/api-<old>.json
+
+Drives /api/predict (payloads generated from each sector's encoder classes),
+/api/config and /api/test/<sector> at several concurrency levels, and writes
+throughput and p50/p95/p99 latency as JSON for comparing commits.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+
+from common import ROOT, latency_summary, launch_gunicorn, print_table, sample_records
+
+SCENARIOS = ['predict', 'config', 'test']
+
+def build_requests(scenario, sectors, n):
+    """(method, path, json_body) tuples for a scenario"""
+    if scenario == 'predict':
+        per_sector = [
+            [('POST', '/api/predict', {'sector': s, 'data': r}) for r in sample_records(s, n, seed=i)]
+            for i, s in enumerate(sectors)
+        ]
+        return [req for group in zip(*per_sector) for req in group]
+    if scenario == 'config':
+        return [('GET', '/api/config', None)]
+    return [('GET', f'/api/test/{s}', None) for s in sectors]
+
+def inprocess_caller():
+    """A per-thread caller that goes through Flask's test client"""
+    from app import app
+    client = app.test_client()
+    
+    def call(method, path, body):
+        return client.open(path, method=method, json=body).status_code
+    return call
+
+def http_caller(base_url):
+    """A per-thread caller with its own keep-alive HTTP session"""
+    import requests
+    session = requests.Session()
+    
+    def call(method, path, body):
+        return session.request(method, base_url + path, json=body, timeout=30).status_code
+    return call
+
+def run_level(make_caller, reqs, concurrency, duration):
+    """Run one concurrency level for duration seconds; return throughput and latencies"""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    callers = [make_caller() for _ in range(concurrency)]
+    
+    # Warm-up so connection setup and first-request work are not measured
+    for caller in callers:
+        caller(*reqs[0])
+    
+    barrier = threading.Barrier(concurrency + 1)
+    
+    def worker(slot):
+        call = callers[slot]
+        barrier.wait()
+        stop = time.perf_counter() + duration
+        for method, path, body in itertools.islice(itertools.cycle(reqs), slot, None, concurrency):
+            if time.perf_counter() >= stop:
+                break
+            start = time.perf_counter()
+            status = call(method, path, body)
+            latencies[slot].append(time.perf_counter() - start)
+            if status >= 400:
+                errors[slot] += 1
+    
+    threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(concurrency)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    
+    merged = [l for per_thread in latencies for l in per_thread]
+    return {
+        'requests': len(merged),
+        'errors': sum(errors),
+        'throughput_rps': round(len(merged) / elapsed, 1),
+        **latency_summary(merged)
+    }
+
+def run_target(target, make_caller, sectors, args):
+    results = []
+    for scenario in args.scenarios:
+        reqs = build_requests(scenario, sectors, args.payloads)
+        for concurrency in args.concurrency:
+            summary = run_level(make_caller, reqs, concurrency, args.duration)
+            results.append({'target': target, 'scenario': scenario, 'concurrency': concurrency, **summary})
+            print(f"{target:>9} {scenario:>8} c={concurrency:<4} {summary['throughput_rps']:>9} req/s  "
+                  f"p50 {summary['p50_ms']}ms  p99 {summary['p99_ms']}ms")
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(old_path, results):
+    """Print throughput and p99 changes against an earlier results file"""
+    with open(old_path) as f:
+        old = {(r['target'], r['scenario'], r['concurrency']): r for r in json.load(f)['results']}
+    
+    rows = []
+    for r in results:
+        before = old.get((r['target'], r['scenario'], r['concurrency']))
+        if before is None:
+            continue
+        rows.append({
+            'target': r['target'], 'scenario': r['scenario'], 'concurrency': r['concurrency'],
+            'rps_before': before['throughput_rps'], 'rps_after': r['throughput_rps'],
+            'rps_change': f"{(r['throughput_rps'] / before['throughput_rps'] - 1) * 100:+.1f}%" if before['throughput_rps'] else 'n/a',
+            'p99_before': before['p99_ms'], 'p99_after': r['p99_ms']
+        })
+    print_table(rows, ['target', 'scenario', 'concurrency', 'rps_before', 'rps_after', 'rps_change', 'p99_before', 'p99_after'])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', nargs='+', choices=['inprocess', 'gunicorn'], default=['inprocess', 'gunicorn'])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per concurrency level')
+    parser.add_argument('--payloads', type=int, default=2000, help='Distinct payloads per sector')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='gunicorn workers')
+    parser.add_argument('--port', type=int, default=5078)
+    parser.add_argument('--no-cache', action='store_true', help='Disable the prediction cache')
+    parser.add_argument('--output', help='Results JSON path (default: benchmarks/results/api-<commit>-<time>.json)')
+    parser.add_argument('--compare', help='Earlier results JSON to compare against')
+    args = parser.parse_args()
+    
+    if args.no_cache:
+        os.environ['PREDICTION_CACHE_SIZE'] = '0'
+    
+    from app import app  # noqa: F401  (loads the models for the in-process target)
+    from models import available_sectors
+    sectors = available_sectors()
+    
+    results = []
+    if 'inprocess' in args.targets:
+        results += run_target('inprocess', inprocess_caller, sectors, args)
+    if 'gunicorn' in args.targets:
+        env = {'PREDICTION_CACHE_SIZE': '0'} if args.no_cache else {}
+        with launch_gunicorn(args.port, args.workers, env) as (base_url, _):
+            results += run_target('gunicorn', lambda: http_caller(base_url), sectors, args)
+    
+    commit = git_commit()
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results', f"api-{commit}-{time.strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'cpus': os.cpu_count(),
+                'duration_s': args.duration,
+                'gunicorn_workers': args.workers,
+                'cache': not args.no_cache
+            },
+            'results': results
+        }, f, indent=2)
+    print(f"Results written to {output}")
+    
+    if args.compare:
+        compare(args.compare, results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+ASGI serving mode vs the threaded Flask server: throughput, tail latency
+and how many requests were shed with 503 under overload
+
+    python benchmarks/bench_asgi.py --concurrency 8 64 256 --duration 10
+
+Needs uvicorn for the ASGI server.
+"""
+
+import argparse
+import os
+import sys
+
+from bench_api import build_requests, http_caller, run_level
+from common import launch_server, print_table
+
+def servers(port, workers, threads, max_queue):
+    """(name, command, env, expected worker processes) per server under test"""
+    return [
+        ('threaded', [sys.executable, 'app.py'], {'PORT': str(port)}, 0),
+        ('asgi', [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port),
+                  '--workers', str(workers), '--no-access-log'],
+         {'ASGI_INFERENCE_THREADS': str(threads), 'ASGI_MAX_QUEUE': str(max_queue)},
+         workers if workers > 1 else 0)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 64, 256])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn worker processes')
+    parser.add_argument('--threads', type=int, default=os.cpu_count(), help='ASGI inference threads')
+    parser.add_argument('--max-queue', type=int, default=64)
+    parser.add_argument('--port', type=int, default=5079)
+    args = parser.parse_args()
+    
+    from models import available_sectors
+    reqs = build_requests('predict', available_sectors(), 2000)
+    
+    rows = []
+    for name, command, env, workers in servers(args.port, args.workers, args.threads, args.max_queue):
+        env = dict(env, PREDICTION_CACHE_SIZE='0')
+        with launch_server(command, args.port, env, workers) as (base_url, _):
+            for concurrency in args.concurrency:
+                summary = run_level(lambda: http_caller(base_url), reqs, concurrency, args.duration)
+                rows.append({'server': name, 'concurrency': concurrency, **summary})
+    
+    print_table(rows, ['server', 'concurrency', 'requests', 'errors', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'])
+    print('errors = non-2xx responses (503 load shedding on the ASGI server)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Predictor backends: equivalence with XGBoost and single-row / batch latency
+
+    python benchmarks/bench_backends.py --iterations 5000 --batch-rows 10000
+
+Backends whose optional packages are missing are reported and skipped.
+"""
+
+import argparse
+import time
+
+from common import latency_summary, print_table, time_calls
+from backends import COMPILERS, check_rows, max_difference
+from config import BACKEND_BUILD_DIR, BACKEND_TOLERANCE
+from models import get_bundle, initialize_models
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--batch-rows', type=int, default=10000)
+    parser.add_argument('--check-rows', type=int, default=5000)
+    args = parser.parse_args()
+    
+    rows = []
+    for sector in initialize_models():
+        bundle = get_bundle(sector)
+        reference = bundle.reference_predictor
+        if reference is None:
+            print(f"{sector}: model needs a DataFrame, no backends to compare")
+            continue
+        
+        n_features = len(bundle.features)
+        check = check_rows(n_features, bundle.lookups, bundle.schema.ranges, bundle.features, args.check_rows, seed=1)
+        batch = check_rows(n_features, bundle.lookups, bundle.schema.ranges, bundle.features, args.batch_rows, seed=2)
+        singles = [(check[i:i + 1],) for i in range(min(args.iterations, len(check)))]
+        
+        backends = [('xgboost', reference)]
+        for name, compile_backend in COMPILERS.items():
+            try:
+                backends.append((name, compile_backend(bundle.model, n_features, BACKEND_BUILD_DIR, f'{sector}-{bundle.fingerprint}')))
+            except Exception as e:
+                print(f"{sector}: {name} backend unavailable: {e}")
+        
+        for name, predict in backends:
+            difference = max_difference(predict, reference, check)
+            summary = latency_summary(time_calls(predict, singles))
+            start = time.perf_counter()
+            predict(batch)
+            batch_us = (time.perf_counter() - start) / len(batch) * 1e6
+            rows.append({
+                'sector': sector,
+                'backend': name,
+                'max_abs_diff': f'{difference:.2e}',
+                'within_tolerance': difference <= BACKEND_TOLERANCE,
+                'single_p50_ms': summary['p50_ms'],
+                'single_p99_ms': summary['p99_ms'],
+                'batch_us_per_row': round(batch_us, 3)
+            })
+    
+    print(f"Tolerance: {BACKEND_TOLERANCE} (absolute)")
+    print_table(rows, ['sector', 'backend', 'max_abs_diff', 'within_tolerance', 'single_p50_ms', 'single_p99_ms', 'batch_us_per_row'])
+
+if __name__ == '__main__':
+    main()
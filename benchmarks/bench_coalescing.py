@@ -0,0 +1,71 @@
+"""
+Load benchmark: concurrent predict_wage calls with and without request coalescing
+
+    python benchmarks/bench_coalescing.py --threads 1 8 32 --duration 5
+"""
+
+import argparse
+import threading
+import time
+
+from common import latency_summary, print_table, sample_records
+from coalescer import RequestCoalescer
+from models import initialize_models
+import predictor
+
+def run_load(sector, records, threads, duration):
+    """Hammer predict_wage from several threads; return (throughput, latencies)"""
+    latencies = [[] for _ in range(threads)]
+    stop = time.perf_counter() + duration
+    
+    def worker(slot):
+        i = slot
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            success, result = predictor.predict_wage(sector, records[i % len(records)])
+            latencies[slot].append(time.perf_counter() - start)
+            if not success:
+                raise RuntimeError(result)
+            i += threads
+    
+    pool = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    
+    merged = [l for per_thread in latencies for l in per_thread]
+    return len(merged) / duration, merged
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    parser.add_argument('--max-rows', type=int, default=64)
+    args = parser.parse_args()
+    
+    # Every call must reach the model
+    predictor.prediction_cache.maxsize = 0
+    
+    rows = []
+    for sector in initialize_models():
+        records = sample_records(sector, 10000)
+        for mode in ['direct', 'coalesced']:
+            predictor.coalescer = (
+                RequestCoalescer(predictor.predict_admitted, args.window_ms, args.max_rows)
+                if mode == 'coalesced' else None
+            )
+            for threads in args.threads:
+                throughput, latencies = run_load(sector, records, threads, args.duration)
+                summary = latency_summary(latencies)
+                batch_size = predictor.coalescer.stats()['mean_batch_size'] if predictor.coalescer else 1
+                rows.append({
+                    'sector': sector, 'mode': mode, 'threads': threads,
+                    'req_per_s': round(throughput, 1), 'mean_batch': batch_size, **summary
+                })
+    
+    print_table(rows, ['sector', 'mode', 'threads', 'req_per_s', 'mean_batch', 'p50_ms', 'p95_ms', 'p99_ms'])
+
+if __name__ == '__main__':
+    main()
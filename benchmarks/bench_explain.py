@@ -0,0 +1,67 @@
+"""
+Per-row cost of TreeSHAP explanations (pred_contribs) vs plain prediction
+
+    python benchmarks/bench_explain.py --rows 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from common import print_table, sample_records
+from models import get_bundle, initialize_models
+from predictor import encode_batch, predict_encoded
+
+def explain_encoded(bundle, matrix):
+    """Contribution rows for an encoded float32 matrix, one model call for all rows"""
+    return bundle.contrib_predictor(matrix)
+
+def per_row_us(fn, bundle, matrix, batch_size, repeats):
+    """Mean microseconds per row when scoring matrix in batches of batch_size"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for offset in range(0, len(matrix), batch_size):
+            fn(bundle, matrix[offset:offset + batch_size])
+        best = min(best, time.perf_counter() - start)
+    return best / len(matrix) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--batch-sizes', default='1,32,512')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    rows = []
+    for sector in initialize_models():
+        bundle = get_bundle(sector)
+        if bundle.contrib_predictor is None:
+            print(f"{sector}: model does not support pred_contribs")
+            continue
+        
+        records = sample_records(sector, args.rows)
+        matrix = encode_batch(bundle, records, range(len(records)))
+        
+        # Contributions must add up to the prediction before timings mean anything
+        contribs = explain_encoded(bundle, matrix)
+        max_diff = float(np.max(np.abs(contribs.sum(axis=1) - predict_encoded(bundle, matrix))))
+        
+        for batch_size in batch_sizes:
+            predict_us = per_row_us(predict_encoded, bundle, matrix, batch_size, args.repeats)
+            explain_us = per_row_us(explain_encoded, bundle, matrix, batch_size, args.repeats)
+            rows.append({
+                'sector': sector,
+                'batch_size': batch_size,
+                'predict_us_per_row': round(predict_us, 2),
+                'explain_us_per_row': round(explain_us, 2),
+                'explain_vs_predict': round(explain_us / predict_us, 1),
+                'max_sum_diff': max_diff
+            })
+    
+    print_table(rows, ['sector', 'batch_size', 'predict_us_per_row', 'explain_us_per_row', 'explain_vs_predict', 'max_sum_diff'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Microbenchmark: pandas-free single-row inference vs the DataFrame path
+
+    python benchmarks/bench_inference_paths.py --iterations 5000
+"""
+
+import argparse
+
+import numpy as np
+
+from common import encode_record, latency_summary, print_table, sample_records, time_calls
+from models import get_bundle, initialize_models
+from predictor import predict_dataframe, predict_encoded
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+    
+    rows = []
+    for sector in initialize_models():
+        bundle = get_bundle(sector)
+        if bundle.row_predictor is None:
+            print(f"{sector}: model needs a DataFrame, no fast path to compare")
+            continue
+        
+        encoded = [encode_record(bundle, r)[1] for r in sample_records(sector, args.iterations)]
+        calls = [(bundle, [row]) for row in encoded]
+        
+        # Both paths must agree before their timings mean anything
+        fast = predict_encoded(bundle, encoded)
+        slow = predict_dataframe(bundle, encoded)
+        max_diff = float(np.max(np.abs(fast - slow)))
+        
+        for path, fn in [('dataframe', predict_dataframe), ('numpy', predict_encoded)]:
+            summary = latency_summary(time_calls(fn, calls))
+            rows.append({'sector': sector, 'path': path, 'max_abs_diff': max_diff, **summary})
+    
+    print_table(rows, ['sector', 'path', 'count', 'p50_ms', 'p99_ms', 'mean_ms', 'max_abs_diff'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Tail latency of one sector while another is flooded, with and without
+per-sector inference isolation
+
+    python benchmarks/bench_isolation.py --victim agriculture --flood construction
+
+Flood threads score large batches of the flood sector back to back while
+the victim sector is measured with single-row predictions.
+"""
+
+import argparse
+import threading
+import time
+
+from common import latency_summary, print_table, sample_records
+import models
+from models import initialize_models, sector_executors
+from predictor import predict_wage, predict_wage_batch, prediction_cache
+
+def flood(sector, records, stop, counts):
+    while not stop.is_set():
+        try:
+            predict_wage_batch(sector, records)
+            counts['ok'] += 1
+        except models.SectorOverloaded:
+            # Like a client honouring Retry-After, just much sooner
+            counts['rejected'] += 1
+            stop.wait(0.01)
+
+def measure(victim, flood_sector, args, isolated):
+    models.SECTOR_ISOLATION = isolated
+    sector_executors.clear()
+    
+    victim_records = sample_records(victim, args.iterations, seed=1)
+    flood_records = sample_records(flood_sector, args.flood_batch, seed=2)
+    stop = threading.Event()
+    counts = {'ok': 0, 'rejected': 0}
+    threads = [
+        threading.Thread(target=flood, args=(flood_sector, flood_records, stop, counts), daemon=True)
+        for _ in range(args.flood_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    
+    latencies = []
+    try:
+        for record in victim_records:
+            start = time.perf_counter()
+            try:
+                predict_wage(victim, record)
+            except models.SectorOverloaded:
+                pass
+            latencies.append(time.perf_counter() - start)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    
+    return {
+        'isolation': 'on' if isolated else 'off',
+        'flood_batches': counts['ok'],
+        'flood_rejected': counts['rejected'],
+        **latency_summary(latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--victim', default='agriculture')
+    parser.add_argument('--flood', default='construction')
+    parser.add_argument('--flood-threads', type=int, default=16)
+    parser.add_argument('--flood-batch', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    
+    # Every victim request must reach the model
+    prediction_cache.maxsize = 0
+    initialize_models()
+    
+    rows = []
+    for isolated in (False, True):
+        baseline = measure(args.victim, args.flood, argparse.Namespace(**{**vars(args), 'flood_threads': 0}), isolated)
+        rows.append({'scenario': 'idle', **baseline})
+        rows.append({'scenario': f'{args.flood} flooded', **measure(args.victim, args.flood, args, isolated)})
+    
+    print_table(rows, ['scenario', 'isolation', 'count', 'p50_ms', 'p95_ms', 'p99_ms', 'flood_batches', 'flood_rejected'])
+
+if __name__ == '__main__':
+    main()
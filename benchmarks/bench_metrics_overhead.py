@@ -0,0 +1,33 @@
+"""
+Overhead of per-stage metrics on predict_wage (metrics on vs off)
+
+    python benchmarks/bench_metrics_overhead.py --iterations 20000
+"""
+
+import argparse
+
+from common import latency_summary, print_table, sample_records, time_calls
+from models import initialize_models
+import metrics
+import predictor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    
+    # Measure the full validate/encode/predict path, not cache hits
+    predictor.prediction_cache.maxsize = 0
+    
+    rows = []
+    for sector in initialize_models():
+        calls = [(sector, r) for r in sample_records(sector, args.iterations)]
+        for enabled in [False, True]:
+            metrics.METRICS_ENABLED = enabled
+            summary = latency_summary(time_calls(predictor.predict_wage, calls))
+            rows.append({'sector': sector, 'metrics': 'on' if enabled else 'off', **summary})
+    
+    print_table(rows, ['sector', 'metrics', 'count', 'p50_ms', 'p99_ms', 'mean_ms'])
+
+if __name__ == '__main__':
+    main()
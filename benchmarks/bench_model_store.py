@@ -0,0 +1,81 @@
+"""
+Load time and memory of pickled vs native (export_models.py) sector models
+
+    python export_models.py
+    python benchmarks/bench_model_store.py --repeat 5
+
+Each load runs in a fresh interpreter so the RSS delta only covers the
+model artefacts; library imports happen before the baseline is taken.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import ROOT, print_table
+
+def rss_kb():
+    """Current resident set size of this process in kB (Linux)"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+def child(sector, store):
+    """Load one sector from one store and print timing and memory as JSON"""
+    import models
+    
+    model_dir, file_config = models.SECTOR_SOURCES[sector]
+    before = rss_kb()
+    start = time.perf_counter()
+    if store == 'native':
+        models.load_native_artifacts(model_dir)
+    else:
+        models.load_pickle_artifacts(model_dir, file_config)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'load_ms': elapsed * 1000, 'rss_delta_mb': (rss_kb() - before) / 1024}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', nargs=2, metavar=('SECTOR', 'STORE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(*args.child)
+        return
+    
+    import models
+    
+    rows = []
+    for sector, (model_dir, _) in models.SECTOR_SOURCES.items():
+        stores = ['pickle']
+        if os.path.exists(models.native_store_path(model_dir)):
+            stores.append('native')
+        else:
+            print(f"{sector}: no native store, run export_models.py first")
+        
+        for store in stores:
+            runs = []
+            for _ in range(args.repeat):
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', sector, store],
+                    cwd=ROOT, capture_output=True, text=True, check=True
+                )
+                runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            rows.append({
+                'sector': sector,
+                'store': store,
+                'load_ms_min': round(min(r['load_ms'] for r in runs), 2),
+                'load_ms_median': round(sorted(r['load_ms'] for r in runs)[len(runs) // 2], 2),
+                'rss_delta_mb': round(sorted(r['rss_delta_mb'] for r in runs)[len(runs) // 2], 2)
+            })
+    
+    print_table(rows, ['sector', 'store', 'load_ms_min', 'load_ms_median', 'rss_delta_mb'])
+
+if __name__ == '__main__':
+    main()
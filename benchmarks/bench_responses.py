@@ -0,0 +1,78 @@
+"""
+Response bytes and CPU per request: JSON provider, slim payloads and gzip
+
+    python benchmarks/bench_responses.py --iterations 500
+
+Requests go through Flask's test client, so CPU time covers routing,
+prediction and serialization but no network I/O.
+"""
+
+import argparse
+import json
+import time
+
+from flask.json.provider import DefaultJSONProvider
+
+from common import print_table, sample_records
+from app import app
+from fastjson import OrjsonProvider, orjson
+from models import available_sectors
+
+def scenarios(sector, batch_rows):
+    records = sample_records(sector, batch_rows)
+    slim = {'echo_input': False, 'estimates': False}
+    return [
+        ('predict', 'POST', '/api/predict', {'sector': sector, 'data': records[0]}),
+        ('predict slim', 'POST', '/api/predict', {'sector': sector, 'data': records[0], 'options': slim}),
+        (f'batch x{batch_rows}', 'POST', '/api/predict/batch', {'sector': sector, 'records': records}),
+        (f'batch x{batch_rows} slim', 'POST', '/api/predict/batch', {'sector': sector, 'records': records, 'options': slim}),
+        ('config', 'GET', '/api/config', None)
+    ]
+
+def measure(client, method, path, payload, gzip, iterations):
+    """Mean response bytes and CPU microseconds per request"""
+    headers = {'Accept-Encoding': 'gzip'} if gzip else {}
+    send = client.post if method == 'POST' else client.get
+    # Encode the request once so only the server side is measured
+    kwargs = {'data': json.dumps(payload), 'content_type': 'application/json'} if payload is not None else {}
+    
+    response = send(path, headers=headers, **kwargs)
+    size = len(response.data)
+    
+    start = time.process_time()
+    for _ in range(iterations):
+        send(path, headers=headers, **kwargs)
+    cpu_us = (time.process_time() - start) / iterations * 1e6
+    return response.status_code, size, cpu_us
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--batch-rows', type=int, default=1000)
+    parser.add_argument('--sector', default=None)
+    args = parser.parse_args()
+    
+    sector = args.sector or available_sectors()[0]
+    providers = [('json', DefaultJSONProvider)] + ([('orjson', OrjsonProvider)] if orjson is not None else [])
+    client = app.test_client()
+    
+    rows = []
+    for name, method, path, payload in scenarios(sector, args.batch_rows):
+        iterations = max(10, args.iterations // 20) if 'batch' in name else args.iterations
+        for provider_name, provider in providers:
+            app.json = provider(app)
+            for gzip in (False, True):
+                status, size, cpu_us = measure(client, method, path, payload, gzip, iterations)
+                rows.append({
+                    'response': name,
+                    'json': provider_name,
+                    'encoding': 'gzip' if gzip else 'identity',
+                    'status': status,
+                    'bytes': size,
+                    'cpu_us': round(cpu_us, 1)
+                })
+    
+    print_table(rows, ['response', 'json', 'encoding', 'status', 'bytes', 'cpu_us'])
+
+if __name__ == '__main__':
+    main()
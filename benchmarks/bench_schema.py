@@ -0,0 +1,56 @@
+"""
+Request decoding: json + key/categorical checks + encoding (the previous path)
+vs the fast JSON parser + compiled one-pass schema
+
+    python benchmarks/bench_schema.py --iterations 20000
+"""
+
+import argparse
+import json
+
+from common import encode_record, latency_summary, print_table, sample_records, time_calls
+from fastjson import JSON_BACKEND, loads
+from models import get_bundle, initialize_models, lookup_code
+
+def previous_path(bundle, body):
+    """Decode and prepare a request body the way /api/predict did before the schema"""
+    data = json.loads(body)['data']
+    if set(bundle.features) - set(data):
+        return False, 'missing'
+    for col, table in bundle.lookups.items():
+        if lookup_code(table, data[col]) is None:
+            return False, 'invalid'
+    return encode_record(bundle, data)
+
+def schema_path(bundle, body):
+    """Decode with the configured parser and validate/encode in one pass"""
+    return bundle.schema.parse(loads(body)['data'])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    
+    rows = []
+    for sector in initialize_models():
+        bundle = get_bundle(sector)
+        bodies = [
+            json.dumps({'sector': sector, 'data': record}).encode('utf-8')
+            for record in sample_records(sector, args.iterations)
+        ]
+        
+        # Both paths must produce the same feature rows
+        mismatches = sum(
+            [float(v) for v in previous_path(bundle, body)[1]] != schema_path(bundle, body)[1]
+            for body in bodies[:1000]
+        )
+        
+        calls = [(bundle, body) for body in bodies]
+        for path, fn in [('previous', previous_path), (f'schema+{JSON_BACKEND}', schema_path)]:
+            summary = latency_summary(time_calls(fn, calls))
+            rows.append({'sector': sector, 'path': path, 'mismatches': mismatches, **summary})
+    
+    print_table(rows, ['sector', 'path', 'count', 'p50_ms', 'p99_ms', 'mean_ms', 'mismatches'])
+
+if __name__ == '__main__':
+    main()
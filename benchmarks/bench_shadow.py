@@ -0,0 +1,121 @@
+"""
+Single-prediction latency with and without shadow model scoring
+
+    SHADOW_ENABLED=True python benchmarks/bench_shadow.py --sector agriculture
+
+A candidate model is trained on the live model's predictions plus noise
+and loaded as the sector's shadow. The same records are then scored with
+no shadow, and with shadow sampling at the configured rates, in alternating
+rounds. The live responses must be identical in every scenario. Afterwards
+the divergence statistics the shadow produced are printed.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import latency_summary, print_table, sample_records
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from backends import check_rows
+from models import SECTOR_SOURCES, clear_shadow_model, get_bundle, initialize_models, load_shadow_model
+from predictor import predict_encoded, predict_wage, prediction_cache, shadow_scorer
+
+def train_candidate(bundle, model_dir, file_config, n_rows, seed=0):
+    """Fit a 'retrained' model on the live predictions with noise and save it like the originals"""
+    matrix = check_rows(len(bundle.features), bundle.lookups, bundle.schema.ranges, bundle.features, n_rows, seed)
+    target = predict_encoded(bundle, matrix)
+    target = target * np.random.default_rng(seed).normal(1.0, 0.05, len(target))
+    
+    model = xgb.XGBRegressor(n_estimators=100, max_depth=6, learning_rate=0.1, n_jobs=1)
+    model.fit(pd.DataFrame(matrix, columns=bundle.features), target)
+    
+    joblib.dump(model, os.path.join(model_dir, file_config['model']))
+    joblib.dump(bundle.encoders, os.path.join(model_dir, file_config['encoders']))
+    joblib.dump(bundle.features, os.path.join(model_dir, file_config['features']))
+    joblib.dump({**bundle.metadata, 'model_version': 'shadow-candidate'}, os.path.join(model_dir, file_config['metadata']))
+
+def wait_for_scoring(sector, timeout=30):
+    """Wait until every queued sample has been scored, so the next round runs on a quiet worker"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = shadow_scorer.stats()
+        divergence = stats['sectors'].get(sector, {})
+        done = sum(divergence.get(name, 0) for name in ('scored', 'rejected', 'errors'))
+        if done >= stats['submitted']:
+            return
+        time.sleep(0.1)
+
+def run(sector, records):
+    latencies, wages = [], []
+    for record in records:
+        start = time.perf_counter()
+        _, result = predict_wage(sector, record)
+        latencies.append(time.perf_counter() - start)
+        wages.append(result['predicted_wage'])
+    return latencies, wages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sector', default='agriculture')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.1, 1.0])
+    parser.add_argument('--train-rows', type=int, default=5000)
+    args = parser.parse_args()
+    
+    if shadow_scorer is None:
+        parser.error('Shadow scoring is disabled; run with SHADOW_ENABLED=True')
+    
+    # Every request must reach the model
+    prediction_cache.maxsize = 0
+    initialize_models([args.sector])
+    bundle = get_bundle(args.sector)
+    records = sample_records(args.sector, args.iterations, seed=1)
+    
+    with tempfile.TemporaryDirectory() as model_dir:
+        train_candidate(bundle, model_dir, SECTOR_SOURCES[args.sector][1], args.train_rows)
+        success, status = load_shadow_model(args.sector, model_dir)
+        if not success:
+            raise SystemExit(f"Could not load the shadow model: {status['error']}")
+    
+    # Alternate scenarios each round so drift in machine load hits them all alike
+    scenarios = [('off', 0.0)] + [(f'{rate:.0%}', rate) for rate in args.rates]
+    latencies = {name: [] for name, _ in scenarios}
+    reference = None
+    mismatches = 0
+    shadow_scorer.sample_rate = 0.0
+    run(args.sector, records[:200])
+    
+    for _ in range(args.rounds):
+        for name, rate in scenarios:
+            shadow_scorer.sample_rate = rate
+            round_latencies, wages = run(args.sector, records)
+            latencies[name].extend(round_latencies)
+            reference = reference or wages
+            mismatches += sum(1 for a, b in zip(wages, reference) if a != b)
+            wait_for_scoring(args.sector)
+    
+    rows = [{'shadow': name, **latency_summary(latencies[name])} for name, _ in scenarios]
+    print_table(rows, ['shadow', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'])
+    print(f'\nlive responses differing from the no-shadow run: {mismatches}')
+    
+    stats = shadow_scorer.stats()
+    divergence = stats['sectors'][args.sector]
+    print(f"submitted {stats['submitted']}, dropped {stats['dropped']}, batches {stats['batches']}, "
+          f"mean batch {stats['mean_batch_ms']} ms")
+    print_table(
+        [{'slice': 'all', **divergence['window']}] + [
+            {'slice': f'{col}={value}', **summary}
+            for col, values in divergence['by_value'].items()
+            for value, summary in list(values.items())[:3]
+        ],
+        ['slice', 'count', 'mean_diff', 'mean_abs_diff', 'p50_abs_diff', 'p95_abs_diff', 'p99_abs_diff']
+    )
+    clear_shadow_model(args.sector)
+
+if __name__ == '__main__':
+    main()
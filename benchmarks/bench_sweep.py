@@ -0,0 +1,46 @@
+"""
+What-if sweep: one vectorized call vs one predict_wage call per point
+
+    python benchmarks/bench_sweep.py --field experience_years --points 50
+"""
+
+import argparse
+
+from common import latency_summary, print_table, sample_records, time_calls
+from models import initialize_models
+from predictor import predict_wage, prediction_cache, sweep_wage
+
+def point_by_point(sector, record, field, values):
+    """The chart as clients build it today: one prediction per point"""
+    return [predict_wage(sector, {**record, field: value})[1]['predicted_wage'] for value in values]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--field', default='experience_years')
+    parser.add_argument('--points', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+    
+    # Cached predictions would flatter the point-by-point path
+    prediction_cache.maxsize = 0
+    values = list(range(args.points))
+    
+    rows = []
+    for sector in initialize_models():
+        records = sample_records(sector, args.iterations)
+        
+        # The sweep must reproduce predict_wage point for point
+        mismatches = 0
+        for record in records[:20]:
+            curve = [p['predicted_wage'] for p in sweep_wage(sector, record, args.field, values)[1]['points']]
+            mismatches += curve != point_by_point(sector, record, args.field, values)
+        
+        calls = [(sector, record, args.field, values) for record in records]
+        for path, fn in [('per_point', point_by_point), ('sweep', sweep_wage)]:
+            summary = latency_summary(time_calls(fn, calls, warmup=10))
+            rows.append({'sector': sector, 'path': path, 'points': args.points, 'mismatched_curves': mismatches, **summary})
+    
+    print_table(rows, ['sector', 'path', 'points', 'count', 'p50_ms', 'p99_ms', 'mean_ms', 'mismatched_curves'])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Shared helpers for benchmark scripts
+
+Benchmarks are run from the repository root, e.g.
+    python benchmarks/bench_inference_paths.py
+"""
+
+import contextlib
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Model directories in config.py are relative to the repository root
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+def sample_records(sector, n, seed=0):
+    """
+    Generate valid records from a sector's encoder classes and the numeric
+    ranges its schema validates (from the sector manifest)
+    """
+    from models import get_bundle
+    
+    rng = random.Random(seed)
+    bundle = get_bundle(sector)
+    tables = bundle.lookups
+    records = []
+    
+    for _ in range(n):
+        record = {}
+        for col in bundle.features:
+            if col in tables:
+                record[col] = rng.choice(tables[col]['classes'])
+            else:
+                low, high = bundle.schema.ranges.get(col, (None, None))
+                low = 0 if low is None else math.ceil(low)
+                high = low + 10 if high is None else math.floor(high)
+                record[col] = rng.randint(low, high)
+        records.append(record)
+    
+    return records
+
+def encode_record(bundle, data):
+    """
+    Encode a validated record into a feature row in model order, the way the
+    API did before the compiled schema (bundle.schema.parse replaces it).
+    Returns: (success, row_or_error)
+    """
+    from models import lookup_code
+    
+    row = []
+    for col in bundle.features:
+        table = bundle.lookups.get(col)
+        if table is None:
+            row.append(data[col])
+            continue
+        
+        encoded = lookup_code(table, data[col])
+        if encoded is None:
+            return False, f"Encoding error for {col}: unknown value '{data[col]}'"
+        row.append(encoded)
+    
+    return True, row
+
+def time_calls(fn, args_list, warmup=50):
+    """Call fn once per argument tuple and return per-call latencies in seconds"""
+    for args in args_list[:warmup]:
+        fn(*args)
+    
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def latency_summary(latencies):
+    """Summarize latencies (seconds) as milliseconds"""
+    values = sorted(latencies)
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 4) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 4),
+        'p95_ms': round(percentile(values, 95) * 1000, 4),
+        'p99_ms': round(percentile(values, 99) * 1000, 4)
+    }
+
+def print_table(rows, columns):
+    """Print a list of dicts as an aligned text table"""
+    widths = {c: max(len(c), *(len(str(r.get(c, ''))) for r in rows)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print('  '.join(str(row.get(c, '')).ljust(widths[c]) for c in columns))
+
+def worker_pids(master_pid):
+    """Child processes of a gunicorn master (Linux)"""
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+@contextlib.contextmanager
+def launch_server(command, port, env=None, workers=0):
+    """
+    Run a server command from the repository root until the block exits.
+    Yields (base_url, process) once /health answers and, if workers > 0,
+    that many worker processes have been forked.
+    """
+    import requests
+    
+    proc = subprocess.Popen(
+        command, cwd=ROOT, env=dict(os.environ, **(env or {})),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.time() + 120
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{' '.join(command)} exited with code {proc.returncode}")
+            try:
+                if requests.get(f'{base_url}/health', timeout=1).ok and len(worker_pids(proc.pid)) >= workers:
+                    break
+            except (requests.ConnectionError, FileNotFoundError):
+                pass
+            if time.time() > deadline:
+                raise RuntimeError(f"{' '.join(command)} did not become ready")
+            time.sleep(0.5)
+        yield base_url, proc
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+
+def launch_gunicorn(port, workers=2, env=None, extra_args=()):
+    """Run `gunicorn app:app` (gunicorn.conf.py settings) with the given worker count"""
+    command = [sys.executable, '-m', 'gunicorn', 'app:app',
+               '--workers', str(workers), '--bind', f'127.0.0.1:{port}', *extra_args]
+    return launch_server(command, port, env, workers)
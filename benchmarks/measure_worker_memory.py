@@ -0,0 +1,68 @@
+"""
+Report per-worker RSS/PSS/USS for gunicorn with and without preloaded models
+
+    python benchmarks/measure_worker_memory.py --workers 4
+
+Linux only: reads /proc/<pid>/smaps_rollup. USS (private pages) is the
+memory a worker would free on exit; with preload_app it should drop by
+roughly the size of the deserialized models.
+"""
+
+import argparse
+
+import requests
+
+from common import launch_gunicorn, print_table, worker_pids
+from registry import SECTORS
+
+def memory_kb(pid):
+    """Rss, Pss and Uss (Private_Clean + Private_Dirty) of a process in kB"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'uss': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }
+
+def measure(preload, workers, port, requests_per_worker):
+    env = {'GUNICORN_PRELOAD': str(preload), 'LAZY_MODEL_LOADING': 'False'}
+    with launch_gunicorn(port, workers, env) as (base, proc):
+        # Exercise the prediction path so the numbers reflect a serving worker
+        for _ in range(requests_per_worker * workers):
+            for sector in SECTORS:
+                requests.get(f'{base}/api/test/{sector}', timeout=10)
+        
+        rows = []
+        for pid in worker_pids(proc.pid):
+            mem = memory_kb(pid)
+            rows.append({'mode': 'preload' if preload else 'per-worker', 'pid': pid,
+                         **{k: round(v / 1024, 1) for k, v in mem.items()}})
+        return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5077)
+    parser.add_argument('--requests-per-worker', type=int, default=50)
+    args = parser.parse_args()
+    
+    rows = []
+    for preload in [False, True]:
+        worker_rows = measure(preload, args.workers, args.port, args.requests_per_worker)
+        rows.extend(worker_rows)
+        rows.append({
+            'mode': ('preload' if preload else 'per-worker') + ' total',
+            'pid': '-',
+            **{k: round(sum(r[k] for r in worker_rows), 1) for k in ['rss', 'pss', 'uss']}
+        })
+    
+    print('Memory in MiB')
+    print_table(rows, ['mode', 'pid', 'rss', 'pss', 'uss'])
+
+if __name__ == '__main__':
+    main()
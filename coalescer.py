@@ -0,0 +1,107 @@
+"""
+Micro-batching coalescer for concurrent single-row predictions
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+from metrics import record_coalesced
+
+class RequestCoalescer:
+    """
+    Collects single-row predictions that arrive within a short window for
+    the same key (sector) and runs them as one matrix prediction per target
+    (the model version each caller pinned).
+    
+    A row waits at most window_ms before its batch is dispatched, so the
+    latency added under low load stays bounded by the window.
+    """
+    
+    def __init__(self, predict_fn, window_ms=2.0, max_rows=64):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self._queues = {}
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+    
+    def submit(self, key, target, row):
+        """Queue one float32 feature row for predict_fn(target, ...) and return a Future"""
+        future = Future()
+        self._queue_for(key).put((target, row, future))
+        return future
+    
+    def predict(self, key, target, row, timeout=None):
+        """Predict one row, blocking until its batch has run"""
+        try:
+            return self.submit(key, target, row).result(timeout)
+        except FutureTimeout:
+            # The row stays queued; its batch completes the abandoned future
+            raise TimeoutError(f"Coalesced prediction for '{key}' did not complete within {timeout}s") from None
+    
+    def stats(self):
+        """Batch counters"""
+        with self._lock:
+            batches, rows = self.batches, self.rows
+        return {
+            'batches': batches,
+            'rows': rows,
+            'mean_batch_size': round(rows / batches, 2) if batches else 0.0,
+            'window_ms': self.window * 1000,
+            'max_rows': self.max_rows
+        }
+    
+    def _queue_for(self, key):
+        q = self._queues.get(key)
+        if q is None:
+            with self._lock:
+                q = self._queues.get(key)
+                if q is None:
+                    q = queue.Queue()
+                    worker = threading.Thread(
+                        target=self._run, args=(key, q), name=f'coalescer-{key}', daemon=True
+                    )
+                    worker.start()
+                    self._queues[key] = q
+        return q
+    
+    def _run(self, key, q):
+        while True:
+            batch = [q.get()]
+            deadline = time.perf_counter() + self.window
+            
+            # Collect until the window closes or the batch is full
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # Rows pinned to different targets (e.g. across a reload) never mix
+            groups = {}
+            for target, row, future in batch:
+                groups.setdefault(id(target), (target, []))[1].append((row, future))
+            for target, items in groups.values():
+                self._dispatch(key, target, items)
+    
+    def _dispatch(self, key, target, items):
+        try:
+            predictions = self.predict_fn(target, np.vstack([row for row, _ in items]))
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+        
+        with self._lock:
+            self.batches += 1
+            self.rows += len(items)
+        record_coalesced(key, len(items))
+        for (_, future), prediction in zip(items, predictions.tolist()):
+            future.set_result(prediction)
@@ -0,0 +1,63 @@
+"""
+gzip response compression when the client accepts it
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from flask import request
+from config import COMPRESS_MIN_BYTES, COMPRESS_LEVEL
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/html', 'text/csv', 'text/plain'}
+
+# Compressed bodies of ETagged responses (precomputed pages), keyed by ETag
+compressed_bodies = OrderedDict()
+compressed_lock = threading.Lock()
+COMPRESSED_CACHE_SIZE = 64
+
+def compress_body(body, etag):
+    """gzip a body, reusing the result for responses with a known ETag"""
+    if etag is None:
+        return gzip.compress(body, COMPRESS_LEVEL)
+    
+    with compressed_lock:
+        cached = compressed_bodies.get(etag)
+        if cached is not None:
+            compressed_bodies.move_to_end(etag)
+            return cached
+    
+    compressed = gzip.compress(body, COMPRESS_LEVEL)
+    with compressed_lock:
+        compressed_bodies[etag] = compressed
+        while len(compressed_bodies) > COMPRESSED_CACHE_SIZE:
+            compressed_bodies.popitem(last=False)
+    return compressed
+
+def compress_response(response):
+    """
+    after_request hook: gzip buffered responses of at least COMPRESS_MIN_BYTES
+    when the request accepts gzip. Streamed responses are left alone.
+    """
+    response.vary.add('Accept-Encoding')
+    
+    if (
+        response.direct_passthrough or response.is_streamed
+        or not 200 <= response.status_code < 300 or response.status_code == 204
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or 'gzip' not in request.accept_encodings
+    ):
+        return response
+    
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    
+    # The compressed representation gets a weak ETag, so If-None-Match
+    # still matches the strong ETag of the uncompressed body
+    etag, _ = response.get_etag()
+    response.set_data(compress_body(body, etag))
+    response.headers['Content-Encoding'] = 'gzip'
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    return response
@@ -2,6 +2,7 @@
 Configuration settings for Labour Wage Prediction API
 """
 
+import json
 import os
 from dotenv import load_dotenv
 
@@ -12,21 +13,119 @@ DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
 PORT = int(os.getenv('PORT', 5000))
 TIMEOUT = int(os.getenv('API_TIMEOUT', 10))
 
-# Model Directories
-AGRICULTURE_MODEL_DIR = 'Agriculture_prediction_models'
-CONSTRUCTION_MODEL_DIR = 'Construction_prediction_models'
+# Sector manifests (comma-separated, read in order): each lists sectors with
+# their model directory, numeric feature ranges and sample payload
+SECTOR_MANIFESTS = [p.strip() for p in os.getenv('SECTOR_MANIFESTS', 'sectors.json').split(',') if p.strip()]
 
-# Model file names
-AGRICULTURE_FILES = {
-    'model': 'xgboost_wage_model.pkl',
-    'encoders': 'label_encoders.pkl',
-    'features': 'feature_names.pkl',
-    'metadata': 'model_metadata.pkl'
-}
+# Threads loading sector models in parallel at startup
+MODEL_LOAD_WORKERS = int(os.getenv('MODEL_LOAD_WORKERS', 4))
+
+# Encode and decode JSON with orjson when it is installed
+FAST_JSON_ENABLED = os.getenv('FAST_JSON_ENABLED', 'True').lower() == 'true'
+
+# Per-sector inference isolation: each sector's model calls run on its own
+# pool of SECTOR_CONCURRENCY threads; past SECTOR_MAX_QUEUE waiting calls a
+# request fails fast, and a call waits at most API_TIMEOUT seconds.
+# MODEL_NTHREAD pins XGBoost's threads per call (0 keeps its default).
+# Manifest entries may override these with "limits": {"concurrency", "max_queue", "nthread"}.
+SECTOR_ISOLATION = os.getenv('SECTOR_ISOLATION', 'False').lower() == 'true'
+SECTOR_CONCURRENCY = int(os.getenv('SECTOR_CONCURRENCY', 4))
+SECTOR_MAX_QUEUE = int(os.getenv('SECTOR_MAX_QUEUE', 32))
+MODEL_NTHREAD = int(os.getenv('MODEL_NTHREAD', 0))
+
+# Predictor backend: xgboost, numpy, treelite or onnx. A backend is used only
+# if it is available and matches XGBoost within BACKEND_TOLERANCE (absolute,
+# in wage units; responses are rounded to 0.01) on BACKEND_CHECK_ROWS generated
+# rows; otherwise xgboost is used.
+# Compiled backends mostly pay off on the small matrices of single-row traffic.
+PREDICTOR_BACKEND = os.getenv('PREDICTOR_BACKEND', 'xgboost').lower()
+BACKEND_TOLERANCE = float(os.getenv('BACKEND_TOLERANCE', 0.01))
+BACKEND_CHECK_ROWS = int(os.getenv('BACKEND_CHECK_ROWS', 1000))
+BACKEND_BUILD_DIR = os.getenv('BACKEND_BUILD_DIR', '.backend_cache')
+# Matrices with more rows than this still use XGBoost (0 sends every call to the backend)
+BACKEND_MAX_ROWS = int(os.getenv('BACKEND_MAX_ROWS', 256))
+
+# gzip responses of at least COMPRESS_MIN_BYTES for clients that accept it
+COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'True').lower() == 'true'
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 5))
+
+# Batch prediction limits
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 50000))
+
+# Most points one what-if sweep may request
+SWEEP_MAX_POINTS = int(os.getenv('SWEEP_MAX_POINTS', 1000))
+
+# Prediction cache (size 0 disables it, TTL 0 keeps entries until evicted)
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 4096))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', 0))
+
+# Explanation (SHAP contribution) cache, same semantics as the prediction cache
+EXPLAIN_CACHE_SIZE = int(os.getenv('EXPLAIN_CACHE_SIZE', 1024))
+EXPLAIN_CACHE_TTL = float(os.getenv('EXPLAIN_CACHE_TTL', 0))
+
+# Micro-batching of concurrent single-row predictions
+COALESCE_ENABLED = os.getenv('COALESCE_ENABLED', 'False').lower() == 'true'
+COALESCE_WINDOW_MS = float(os.getenv('COALESCE_WINDOW_MS', 2))
+COALESCE_MAX_ROWS = int(os.getenv('COALESCE_MAX_ROWS', 64))
 
-CONSTRUCTION_FILES = {
-    'model': 'construction_wage_model.pkl',
-    'encoders': 'construction_label_encoders.pkl',
-    'features': 'construction_feature_names.pkl',
-    'metadata': 'construction_model_metadata.pkl'
-}
\ No newline at end of file
+# Lazy model loading: sectors load on first use, except the warm-up list
+LAZY_MODEL_LOADING = os.getenv('LAZY_MODEL_LOADING', 'False').lower() == 'true'
+WARMUP_SECTORS = [s.strip() for s in os.getenv('WARMUP_SECTORS', '').split(',') if s.strip()]
+
+# Native model store written by export_models.py (preferred over the pickles)
+NATIVE_STORE_FILE = 'model_store.json'
+PREFER_NATIVE_MODELS = os.getenv('PREFER_NATIVE_MODELS', 'True').lower() == 'true'
+
+# Hot model reload (admin endpoints are disabled unless ADMIN_TOKEN is set;
+# a watch interval of 0 disables polling the model files for changes)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+MODEL_WATCH_INTERVAL = float(os.getenv('MODEL_WATCH_INTERVAL', 0))
+
+# Per-stage latency metrics served at /metrics
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+
+# Rows scored per model call by the streaming bulk endpoint
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 1000))
+
+# ASGI serving mode (asgi.py): inference pool size, waiting requests allowed
+# before answering 503, Retry-After seconds and the largest buffered body
+ASGI_INFERENCE_THREADS = int(os.getenv('ASGI_INFERENCE_THREADS', os.cpu_count() or 4))
+ASGI_MAX_QUEUE = int(os.getenv('ASGI_MAX_QUEUE', 64))
+ASGI_RETRY_AFTER = int(os.getenv('ASGI_RETRY_AFTER', 1))
+ASGI_MAX_BODY_BYTES = int(os.getenv('ASGI_MAX_BODY_BYTES', 64 * 1024 * 1024))
+
+# Prediction audit log: records queue in memory and a background thread writes
+# them to rotating gzip NDJSON files. When the queue is full, 'drop' discards the
+# record and 'block' makes the request wait up to AUDIT_BLOCK_TIMEOUT seconds;
+# any other policy is an error at startup.
+AUDIT_ENABLED = os.getenv('AUDIT_ENABLED', 'False').lower() == 'true'
+AUDIT_DIR = os.getenv('AUDIT_DIR', 'audit_logs')
+AUDIT_MAX_QUEUE = int(os.getenv('AUDIT_MAX_QUEUE', 10000))
+AUDIT_FULL_POLICY = os.getenv('AUDIT_FULL_POLICY', 'drop').lower()
+AUDIT_BLOCK_TIMEOUT = float(os.getenv('AUDIT_BLOCK_TIMEOUT', 1.0))
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 500))
+AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', 1.0))
+AUDIT_ROTATE_BYTES = int(os.getenv('AUDIT_ROTATE_BYTES', 64 * 1024 * 1024))
+AUDIT_ROTATE_SECONDS = float(os.getenv('AUDIT_ROTATE_SECONDS', 3600))
+
+# Shadow model evaluation: a sampled fraction of single predictions is queued
+# and re-scored in batches by the sector's shadow model on a background thread.
+# Divergence percentiles cover the last SHADOW_WINDOW scored records per sector.
+SHADOW_ENABLED = os.getenv('SHADOW_ENABLED', 'False').lower() == 'true'
+SHADOW_SAMPLE_RATE = float(os.getenv('SHADOW_SAMPLE_RATE', 0.1))
+SHADOW_MAX_QUEUE = int(os.getenv('SHADOW_MAX_QUEUE', 10000))
+SHADOW_BATCH_SIZE = int(os.getenv('SHADOW_BATCH_SIZE', 256))
+SHADOW_FLUSH_INTERVAL = float(os.getenv('SHADOW_FLUSH_INTERVAL', 0.5))
+SHADOW_WINDOW = int(os.getenv('SHADOW_WINDOW', 10000))
+
+# Precomputed wage grid (scored once per model load, before the version is published;
+# preloaded gunicorn workers build it after fork). Numeric fields take the listed values.
+GRID_ENABLED = os.getenv('GRID_ENABLED', 'False').lower() == 'true'
+GRID_MAX_CELLS = int(os.getenv('GRID_MAX_CELLS', 5000000))
+GRID_NUMERIC_VALUES = json.loads(os.getenv('GRID_NUMERIC_VALUES', 'null')) or {
+    'age': [25, 30, 35, 40, 45, 50],
+    'experience_years': [0, 2, 5, 10, 15, 20],
+    'skill_level': [1, 2, 3, 4, 5],
+    'working_hours': [6, 7, 8, 9, 10, 11, 12]
+}
@@ -0,0 +1,186 @@
+"""
+Per-feature wage explanations from XGBoost TreeSHAP contributions
+"""
+
+import time
+import numpy as np
+from cache import LRUCache
+from config import EXPLAIN_CACHE_SIZE, EXPLAIN_CACHE_TTL
+from metrics import record_error, record_stage
+from models import SectorOverloaded, get_bundle, register_reload_hook, run_in_sector
+from predictor import cache_key, encode_batch, predict_encoded
+from validators import validate_batch, validate_sector
+
+# (contribution row, prediction) keyed like the prediction cache: (sector, generation, encoded tuple)
+explanation_cache = LRUCache(EXPLAIN_CACHE_SIZE, EXPLAIN_CACHE_TTL)
+
+# Largest gap allowed between a row's contribution sum and the model output
+# before it is counted as an additivity error (both accumulate in float32)
+ADDITIVITY_TOLERANCE = 0.05
+
+@register_reload_hook
+def _invalidate_sector_cache(sector):
+    explanation_cache.invalidate(lambda key: key[0] == sector)
+
+def feature_label(bundle, col, value):
+    """Original value of an encoded feature: its class label, or the number itself"""
+    table = bundle.lookups.get(col)
+    if table is None:
+        return float(value)
+    return table['classes'][int(value)]
+
+def format_explanation(bundle, row, contribs, prediction):
+    """
+    Map one contribution row back to feature names and input labels.
+    The predicted wage is the model output, exactly as /api/predict reports it.
+    Contributions are sorted by absolute effect, largest first.
+    """
+    contributions = [
+        {
+            'feature': col,
+            'value': feature_label(bundle, col, value),
+            'contribution': round(float(contrib), 4)
+        }
+        for col, value, contrib in zip(bundle.features, row, contribs)
+    ]
+    contributions.sort(key=lambda c: abs(c['contribution']), reverse=True)
+    
+    return {
+        'predicted_wage': round(max(float(prediction), 0), 2),
+        'base_value': round(float(contribs[-1]), 4),
+        'contributions': contributions
+    }
+
+def contributions_and_predictions(bundle, matrix):
+    return bundle.contrib_predictor(matrix), predict_encoded(bundle, matrix)
+
+def explain_and_predict(bundle, matrix):
+    """
+    Contribution rows and model predictions for an encoded float32 matrix,
+    run together under the sector's limit. Rows whose contributions do not
+    add up to the prediction are counted as 'explain_additivity' errors.
+    """
+    if bundle.contrib_predictor is None:
+        raise ValueError(f"Model for {bundle.sector} does not support explanations")
+    contribs, predictions = run_in_sector(bundle.sector, contributions_and_predictions, bundle, matrix)
+    
+    gaps = np.abs(contribs.sum(axis=1) - predictions)
+    for _ in range(int(np.count_nonzero(gaps > ADDITIVITY_TOLERANCE))):
+        record_error(bundle.sector, 'explain_additivity')
+    return contribs.tolist(), predictions.tolist()
+
+def explain_wage(sector, data):
+    """
+    Explain the predicted wage for given sector and worker data
+    Returns: (success, result_or_error)
+    """
+    try:
+        bundle = get_bundle(sector)
+        if bundle is None:
+            return validate_sector(sector)
+        
+        # Repeated inputs are answered from the explanation cache
+        key = cache_key(bundle, data) if explanation_cache.enabled else None
+        explained = explanation_cache.get(key) if key is not None else None
+        
+        if explained is None:
+            is_valid, row = bundle.schema.parse(data)
+            if not is_valid:
+                record_error(sector, 'validate')
+                return False, row
+            
+            start = time.perf_counter()
+            contrib_rows, predictions = explain_and_predict(bundle, np.asarray([row], dtype=np.float32))
+            explained = (contrib_rows[0], predictions[0])
+            record_stage(sector, 'explain', start)
+            
+            if key is not None:
+                explanation_cache.put(key, explained)
+        else:
+            row = key[2]
+        
+        return True, {
+            'success': True,
+            'sector': sector,
+            'model_version': bundle.version,
+            **format_explanation(bundle, row, *explained),
+            'input_data': data
+        }
+    
+    except SectorOverloaded:
+        record_error(sector, 'overloaded')
+        raise
+    
+    except Exception as e:
+        record_error(sector, 'exception')
+        return False, str(e)
+
+def explain_wage_batch(sector, records):
+    """
+    Explain wages for a batch of worker records. Uncached records are
+    explained with a single model call; invalid records are reported per row.
+    Returns: (success, result_or_error)
+    """
+    try:
+        bundle = get_bundle(sector)
+        if bundle is None:
+            return validate_sector(sector)
+        
+        is_valid, row_errors = validate_batch(sector, records, bundle)
+        if not is_valid:
+            record_error(sector, 'batch_validate')
+            return False, row_errors
+        
+        valid_rows = [i for i, error in enumerate(row_errors) if error is None]
+        explained = {}
+        
+        if valid_rows:
+            matrix = encode_batch(bundle, records, valid_rows)
+            
+            # Only rows missing from the cache go to the model
+            keys = [
+                cache_key(bundle, records[i]) if explanation_cache.enabled else None
+                for i in valid_rows
+            ]
+            missing = []
+            for position, key in enumerate(keys):
+                cached = explanation_cache.get(key) if key is not None else None
+                if cached is None:
+                    missing.append(position)
+                else:
+                    explained[valid_rows[position]] = (matrix[position], *cached)
+            
+            if missing:
+                start = time.perf_counter()
+                contrib_rows, predictions = explain_and_predict(bundle, matrix[missing])
+                record_stage(sector, 'batch_explain', start)
+                for position, contribs, prediction in zip(missing, contrib_rows, predictions):
+                    if keys[position] is not None:
+                        explanation_cache.put(keys[position], (contribs, prediction))
+                    explained[valid_rows[position]] = (matrix[position], contribs, prediction)
+        
+        results = []
+        for i, error in enumerate(row_errors):
+            if error is None:
+                results.append({'index': i, 'success': True, **format_explanation(bundle, *explained[i])})
+            else:
+                results.append({'index': i, 'success': False, 'error': error})
+        
+        succeeded = len(valid_rows)
+        return True, {
+            'success': True,
+            'sector': sector,
+            'model_version': bundle.version,
+            'total': len(records),
+            'succeeded': succeeded,
+            'failed': len(records) - succeeded,
+            'results': results
+        }
+    
+    except SectorOverloaded:
+        record_error(sector, 'overloaded')
+        raise
+    
+    except Exception as e:
+        record_error(sector, 'exception')
+        return False, str(e)
@@ -0,0 +1,98 @@
+"""
+Export sector models from pickle to XGBoost's native format
+
+    python export_models.py                          # every sector, UBJSON
+    python export_models.py construction --format json
+
+Writes <model_dir>/model.ubj (or model.json) and a JSON sidecar
+(<model_dir>/model_store.json) with encoder classes, feature names and
+metadata. models.load_sector_model prefers this store over the .pkl files.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import xgboost as xgb
+
+from models import SECTOR_SOURCES, load_native_artifacts, load_pickle_artifacts, native_store_path
+
+def to_jsonable(value):
+    """Convert numpy scalars/arrays and other metadata values into JSON types"""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_jsonable(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def sample_matrix(sector_encoders, feature_names, n=1000, seed=0):
+    """Random encoded feature rows for comparing exported and pickled models"""
+    rng = np.random.default_rng(seed)
+    matrix = np.empty((n, len(feature_names)), dtype=np.float32)
+    for j, col in enumerate(feature_names):
+        if col in sector_encoders:
+            matrix[:, j] = rng.integers(0, len(sector_encoders[col].classes_), n)
+        else:
+            matrix[:, j] = rng.uniform(0, 60, n)
+    return matrix
+
+def export_sector(sector, model_format):
+    """Export one sector and check the exported model predicts identically"""
+    model_dir, file_config = SECTOR_SOURCES[sector]
+    model, sector_encoders, feature_names, sector_metadata = load_pickle_artifacts(model_dir, file_config)
+    
+    if not isinstance(model, xgb.XGBRegressor):
+        raise TypeError(f"{sector}: only XGBRegressor models can be exported, got {type(model).__name__}")
+    
+    model_file = f'model.{model_format}'
+    model.save_model(os.path.join(model_dir, model_file))
+    
+    store = {
+        'format_version': 1,
+        'sector': sector,
+        'model_file': model_file,
+        'features': list(feature_names),
+        'encoders': {col: to_jsonable(enc.classes_) for col, enc in sector_encoders.items()},
+        'metadata': to_jsonable(sector_metadata)
+    }
+    
+    # Write the sidecar last and atomically: its presence switches loading over
+    sidecar_path = native_store_path(model_dir)
+    tmp_path = sidecar_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(store, f, separators=(',', ':'))
+    os.replace(tmp_path, sidecar_path)
+    
+    exported = load_native_artifacts(model_dir)[0]
+    matrix = sample_matrix(sector_encoders, list(feature_names))
+    max_diff = float(np.max(np.abs(model.predict(matrix) - exported.predict(matrix))))
+    
+    return {
+        'sector': sector,
+        'model_path': os.path.join(model_dir, model_file),
+        'sidecar_path': sidecar_path,
+        'max_abs_diff': max_diff
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Export sector models to XGBoost native format')
+    parser.add_argument('sectors', nargs='*', default=list(SECTOR_SOURCES))
+    parser.add_argument('--format', choices=['ubj', 'json'], default='ubj')
+    args = parser.parse_args()
+    
+    for sector in args.sectors:
+        if sector not in SECTOR_SOURCES:
+            parser.error(f"Unknown sector '{sector}'. Available: {list(SECTOR_SOURCES)}")
+        result = export_sector(sector, args.format)
+        print(f"{result['sector']}: wrote {result['model_path']} and {result['sidecar_path']} "
+              f"(max abs prediction diff vs pickle: {result['max_abs_diff']:.6g})")
+
+if __name__ == '__main__':
+    main()
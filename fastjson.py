@@ -0,0 +1,48 @@
+"""
+JSON encoding and decoding with an optional faster library (orjson) when it is installed
+"""
+
+import json
+from flask.json.provider import DefaultJSONProvider
+from config import FAST_JSON_ENABLED
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None and FAST_JSON_ENABLED else 'json'
+
+def loads(data):
+    """Decode a JSON document from bytes or str; raises ValueError if it is invalid"""
+    if JSON_BACKEND == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson. Output is compact and keys keep
+    their insertion order (sort_keys is not applied); values orjson cannot
+    serialize fall back to Flask's default conversions.
+    """
+    
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson is not None else 0
+    
+    def encode(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self.options)
+    
+    def dumps(self, obj, **kwargs):
+        return self.encode(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self._app.debug:
+            return super().response(obj)
+        return self._app.response_class(self.encode(obj) + b'\n', mimetype=self.mimetype)
+
+def json_provider_class():
+    """The JSON provider create_app installs: orjson when enabled and installed"""
+    return OrjsonProvider if JSON_BACKEND == 'orjson' else DefaultJSONProvider
@@ -0,0 +1,100 @@
+"""
+Precomputed wage grid over categorical and bounded numeric features
+"""
+
+import numpy as np
+
+class WageGrid:
+    """
+    Dense table of predicted wages, one axis per model feature in model order.
+    Categorical axes cover every encoder class (index = encoded value);
+    numeric axes cover a configured list of values.
+    """
+    
+    def __init__(self, features, labels, numeric_index, table):
+        self.features = features
+        self.labels = labels
+        self.numeric_index = numeric_index
+        self.table = table
+    
+    @property
+    def cells(self):
+        return int(self.table.size)
+    
+    def lookup(self, row):
+        """Wage for an encoded feature row, or None if it is not a grid point"""
+        index = []
+        for j, value in enumerate(row):
+            axis_index = self.numeric_index[j]
+            if axis_index is None:
+                index.append(value)
+                continue
+            try:
+                position = axis_index.get(float(value))
+            except (TypeError, ValueError):
+                return None
+            if position is None:
+                return None
+            index.append(position)
+        return float(self.table[tuple(index)])
+    
+    def cut(self, by, fixed=None, agg='mean'):
+        """
+        Wage table over one or two dimensions. Other dimensions are pinned to
+        the label given in fixed, or aggregated (mean/min/max) over the grid.
+        Returns: (labels per dimension in by, nested list of wages)
+        """
+        fixed = fixed or {}
+        reducer = {'mean': np.mean, 'min': np.min, 'max': np.max}[agg]
+        
+        table = self.table
+        kept = []
+        # Pin fixed dimensions from the last axis backwards so indices stay valid
+        for j in reversed(range(len(self.features))):
+            col = self.features[j]
+            if col in fixed:
+                table = np.take(table, self.labels[col].index(fixed[col]), axis=j)
+            elif col not in by:
+                table = reducer(table, axis=j)
+            else:
+                kept.insert(0, col)
+        
+        table = np.transpose(table, [kept.index(col) for col in by])
+        return {col: self.labels[col] for col in by}, np.round(table.astype(np.float64), 2).tolist()
+
+def build_grid(bundle, predict_fn, numeric_values, max_cells, chunk_rows=200000):
+    """
+    Score every grid combination once, in chunks, with predict_fn(bundle, matrix).
+    Returns: (grid_or_None, reason)
+    """
+    labels = {}
+    axes = []
+    numeric_index = []
+    
+    for col in bundle.features:
+        table = bundle.lookups.get(col)
+        if table is not None:
+            labels[col] = list(table['classes'])
+            axes.append(np.arange(len(table['classes']), dtype=np.float32))
+            numeric_index.append(None)
+        elif col in numeric_values:
+            values = list(numeric_values[col])
+            labels[col] = values
+            axes.append(np.asarray(values, dtype=np.float32))
+            numeric_index.append({float(v): i for i, v in enumerate(values)})
+        else:
+            return None, f"No grid values configured for numeric field '{col}'"
+    
+    shape = tuple(len(axis) for axis in axes)
+    cells = int(np.prod(shape))
+    if cells > max_cells:
+        return None, f"Grid has {cells} cells, more than the limit of {max_cells}"
+    
+    table = np.empty(cells, dtype=np.float32)
+    for start in range(0, cells, chunk_rows):
+        flat = np.arange(start, min(start + chunk_rows, cells))
+        positions = np.unravel_index(flat, shape)
+        matrix = np.column_stack([axis[pos] for axis, pos in zip(axes, positions)])
+        table[start:start + len(flat)] = np.maximum(predict_fn(bundle, matrix), 0)
+    
+    return WageGrid(list(bundle.features), labels, numeric_index, table.reshape(shape)), None
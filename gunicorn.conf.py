@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for the Labour Wage Prediction API
+
+    gunicorn app:app
+
+Gunicorn picks this file up from the working directory. With preload_app
+the models are deserialized once in the master and forked workers share
+those pages copy-on-write instead of each calling joblib.load.
+"""
+
+import gc
+import multiprocessing
+import os
+import threading
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+if preload_app:
+    # Set before the app is imported: bundles loaded in the master skip the
+    # steps that make predictions (models.prepare_bundle)
+    import models
+    models.defer_preparation = True
+
+def when_ready(server):
+    """Load every sector in the master, then freeze it out of the GC before forking"""
+    if not preload_app:
+        return
+    
+    # Importing app already ran initialize_models(); in lazy mode that only
+    # covered the warm-up list, but sharing only pays off for models loaded here.
+    # No prediction runs in the master: forking after XGBoost has started its
+    # OpenMP thread pool can deadlock the workers.
+    from models import SECTOR_SOURCES, initialize_models
+    loaded = initialize_models(list(SECTOR_SOURCES))
+    server.log.info(f"Preloaded sector models in master: {loaded}")
+    
+    # The cyclic GC writes to every tracked object's header when it scans,
+    # which would copy the shared pages into each worker. Moving everything
+    # allocated so far into the permanent generation keeps them untouched.
+    gc.collect()
+    gc.freeze()
+
+def post_fork(server, worker):
+    """Prepare the preloaded bundles in the worker; requests use them unprepared meanwhile"""
+    if not preload_app:
+        return
+    
+    import models
+    models.defer_preparation = False
+    threading.Thread(target=models.prepare_loaded_bundles, name='prepare-bundles', daemon=True).start()
@@ -0,0 +1,152 @@
+"""
+Lightweight, thread-safe metrics served in Prometheus text format
+"""
+
+import bisect
+import threading
+import time
+from config import METRICS_ENABLED
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+class Counter:
+    """Monotonic counter broken down by label values"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{format_labels(self.labels, k)} {v}' for k, v in items]
+
+class Histogram:
+    """Bucketed distribution of observations broken down by label values"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        
+        lines = []
+        for label_values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                labels = format_labels(self.labels + ('le',), label_values + (bound,))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+STAGE_LATENCY = Histogram(
+    'wage_stage_duration_seconds',
+    'Time spent in each stage of a prediction request',
+    ['sector', 'stage']
+)
+REQUESTS = Counter(
+    'wage_http_requests_total',
+    'HTTP requests by endpoint, sector and status code',
+    ['endpoint', 'sector', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'wage_http_request_duration_seconds',
+    'End-to-end HTTP request latency',
+    ['endpoint', 'sector']
+)
+ERRORS = Counter(
+    'wage_prediction_errors_total',
+    'Failed predictions by sector and the stage that failed',
+    ['sector', 'stage']
+)
+
+COALESCED_BATCHES = Counter(
+    'wage_coalesced_batches_total',
+    'Model calls made by the request coalescer',
+    ['sector']
+)
+COALESCED_ROWS = Counter(
+    'wage_coalesced_rows_total',
+    'Rows predicted through the request coalescer (divide by batches for the mean batch size)',
+    ['sector']
+)
+
+registry = [STAGE_LATENCY, REQUESTS, REQUEST_LATENCY, ERRORS, COALESCED_BATCHES, COALESCED_ROWS]
+
+def register(metric):
+    """Add a metric to the /metrics output"""
+    registry.append(metric)
+    return metric
+
+def record_stage(sector, stage, start):
+    """Record the time since start (a time.perf_counter() value) for a stage"""
+    if METRICS_ENABLED:
+        STAGE_LATENCY.observe(time.perf_counter() - start, sector, stage)
+
+def record_error(sector, stage):
+    """Count a failed prediction"""
+    if METRICS_ENABLED:
+        ERRORS.inc(sector, stage)
+
+def record_coalesced(sector, rows):
+    """Count one coalesced model call and the rows it predicted"""
+    if METRICS_ENABLED:
+        COALESCED_BATCHES.inc(sector)
+        COALESCED_ROWS.inc(sector, amount=rows)
+
+def record_request(endpoint, sector, status, start):
+    """Count an HTTP request and record its latency"""
+    if METRICS_ENABLED:
+        REQUESTS.inc(endpoint, sector, status)
+        REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint, sector)
+
+def render_metrics():
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in registry:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
@@ -2,71 +2,600 @@
 Load and manage ML models
 """
 
+import copy
+import hashlib
 import joblib
+import json
+import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import numpy as np
+import xgboost as xgb
+from sklearn.preprocessing import LabelEncoder
 from config import (
-    AGRICULTURE_MODEL_DIR, CONSTRUCTION_MODEL_DIR,
-    AGRICULTURE_FILES, CONSTRUCTION_FILES
+    LAZY_MODEL_LOADING, WARMUP_SECTORS, MODEL_LOAD_WORKERS,
+    NATIVE_STORE_FILE, PREFER_NATIVE_MODELS, TIMEOUT,
+    SECTOR_ISOLATION, SECTOR_CONCURRENCY, SECTOR_MAX_QUEUE, MODEL_NTHREAD,
+    PREDICTOR_BACKEND, BACKEND_TOLERANCE, BACKEND_CHECK_ROWS, BACKEND_BUILD_DIR, BACKEND_MAX_ROWS
 )
+from backends import check_rows, select_backend
+from registry import SECTORS
+from schema import compile_schema
 
-# Global model storage
-models = {}
-encoders = {}
-features = {}
-metadata = {}
+logger = logging.getLogger(__name__)
 
-def load_sector_model(sector_name, model_dir, file_config):
-    """Load models for a specific sector"""
+# Where each registered sector's model files live
+SECTOR_SOURCES = {name: (spec.model_dir, spec.files) for name, spec in SECTORS.items()}
+
+# Global model storage: the active SectorBundle of each sector
+bundles = {}
+generations = {}
+reload_hooks = []
+publish_lock = threading.Lock()
+
+# Steps that make predictions (verifying the predictor backend, scoring the
+# wage grid), run on a bundle before it is published. A preloading gunicorn
+# master sets defer_preparation: predicting there can deadlock forked workers,
+# so its bundles are published unprepared, on the XGBoost reference, and each
+# worker prepares them after fork (prepare_loaded_bundles).
+bundle_preparers = []
+defer_preparation = False
+
+# Lazy loading state
+load_locks = {sector: threading.Lock() for sector in SECTOR_SOURCES}
+load_attempted = set()
+
+# Per-sector inference executors, created on first use
+sector_executors = {}
+executors_lock = threading.Lock()
+
+# Shadow models: an unpublished SectorBundle per sector that only re-scores
+# sampled requests off the request path (see shadow.py), and the last load outcome
+shadow_bundles = {}
+shadow_status = {}
+
+def normalize_value(value):
+    """Normalize a categorical value before lookup"""
+    return value.strip() if isinstance(value, str) else value
+
+def compile_lookups(sector_encoders):
+    """
+    Compile fitted LabelEncoders into plain lookup tables.
+    Each column maps normalized class values to their encoded integer,
+    matching LabelEncoder.transform without its per-call overhead.
+    """
+    tables = {}
+    for col, encoder in sector_encoders.items():
+        classes = [normalize_value(c) for c in encoder.classes_.tolist()]
+        tables[col] = {
+            'codes': {value: code for code, value in enumerate(classes)},
+            'classes': classes
+        }
+    return tables
+
+def lookup_code(table, value):
+    """Return the encoded value for a raw input, or None if it is not a known class"""
     try:
-        model_path = os.path.join(model_dir, file_config['model'])
-        encoder_path = os.path.join(model_dir, file_config['encoders'])
-        features_path = os.path.join(model_dir, file_config['features'])
-        metadata_path = os.path.join(model_dir, file_config['metadata'])
+        return table['codes'].get(normalize_value(value))
+    except TypeError:
+        # Unhashable input can never be a valid class
+        return None
+
+def compile_row_predictor(model, n_features):
+    """
+    Build a pandas-free predict function for float32 feature matrices.
+    Returns None when the model needs a DataFrame: non-XGBoost models,
+    native categorical features or a feature count mismatch.
+    """
+    get_booster = getattr(model, 'get_booster', None)
+    if get_booster is None:
+        return None
+    
+    try:
+        booster = get_booster()
+    except Exception:
+        return None
+    
+    if 'c' in (booster.feature_types or []) or booster.num_features() != n_features:
+        return None
+    
+    # Match XGBRegressor.predict when the model was trained with early stopping
+    best_iteration = getattr(model, 'best_iteration', None)
+    iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+    
+    def predict(matrix):
+        return booster.inplace_predict(
+            matrix, iteration_range=iteration_range, validate_features=False
+        )
+    
+    return predict
+
+def compile_contrib_predictor(model, n_features):
+    """
+    Build a TreeSHAP function for float32 feature matrices using XGBoost's
+    pred_contribs. Each output row holds one contribution per feature
+    followed by the bias; a row sums to the model's raw prediction.
+    Returns None when the model is not an XGBoost model.
+    """
+    get_booster = getattr(model, 'get_booster', None)
+    if get_booster is None:
+        return None
+    
+    try:
+        booster = get_booster()
+    except Exception:
+        return None
+    
+    if booster.num_features() != n_features:
+        return None
+    
+    best_iteration = getattr(model, 'best_iteration', None)
+    iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+    
+    def contributions(matrix):
+        return booster.predict(
+            xgb.DMatrix(matrix), pred_contribs=True,
+            iteration_range=iteration_range, validate_features=False
+        )
+    
+    return contributions
+
+def sector_limit(sector, name, default):
+    """A sector's inference limit: its manifest override or the configured default"""
+    spec = SECTORS.get(sector)
+    return int(spec.limits.get(name, default)) if spec is not None else default
+
+def pin_model_threads(model, nthread):
+    """Fix the number of threads XGBoost uses per predict call (0 leaves it unchanged)"""
+    if nthread <= 0 or not hasattr(model, 'get_booster'):
+        return
+    model.set_params(n_jobs=nthread)
+    model.get_booster().set_param({'nthread': nthread})
+
+class SectorOverloaded(Exception):
+    """A sector's inference queue is full or a call waited longer than its timeout"""
+
+class SectorExecutor:
+    """
+    Bounded inference pool of one sector. At most `concurrency` model calls
+    run at once and at most `max_queue` more wait; beyond that a call fails
+    immediately instead of queueing behind a flood of the same sector.
+    """
+    
+    def __init__(self, sector, concurrency, max_queue, timeout):
+        self.sector = sector
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f'infer-{sector}')
+        self._slots = threading.BoundedSemaphore(concurrency + max_queue)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+    
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+        self._slots.release()
+    
+    def run(self, fn, *args):
+        """Run fn(*args) on the sector's pool and wait for it; raises SectorOverloaded"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise SectorOverloaded(f"Sector '{self.sector}' is overloaded, retry later")
         
-        # Check if directory exists
-        if not os.path.isdir(model_dir):
-            return False
+        with self._lock:
+            self.in_flight += 1
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._release)
         
-        # Check if critical files exist
-        if not all(os.path.exists(p) for p in [model_path, encoder_path, features_path]):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # A call still waiting is dropped; one already running finishes unobserved
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise SectorOverloaded(f"Sector '{self.sector}' did not respond within {self.timeout}s")
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'concurrency': self.concurrency,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out
+            }
+
+def get_executor(sector):
+    """Get (creating on first use) the inference executor of a sector"""
+    executor = sector_executors.get(sector)
+    if executor is None:
+        with executors_lock:
+            executor = sector_executors.get(sector)
+            if executor is None:
+                executor = SectorExecutor(
+                    sector,
+                    max(1, sector_limit(sector, 'concurrency', SECTOR_CONCURRENCY)),
+                    max(0, sector_limit(sector, 'max_queue', SECTOR_MAX_QUEUE)),
+                    TIMEOUT
+                )
+                sector_executors[sector] = executor
+    return executor
+
+def run_in_sector(sector, fn, *args):
+    """
+    Run a model call under the sector's concurrency limit, or inline when
+    isolation is disabled. Raises SectorOverloaded when the sector is saturated.
+    """
+    if not SECTOR_ISOLATION:
+        return fn(*args)
+    return get_executor(sector).run(fn, *args)
+
+def executor_stats():
+    """Per-sector executor counters (empty when isolation is disabled)"""
+    return {sector: executor.stats() for sector, executor in list(sector_executors.items())}
+
+class SectorBundle:
+    """
+    One loaded version of a sector: model, encoders, features and metadata,
+    plus the lookup tables and predict function compiled from them.
+    A published bundle is never mutated, so a request that holds one keeps
+    a consistent view even if the sector is reloaded while it runs.
+    """
+    
+    def __init__(self, sector, model, encoders, features, metadata, source, fingerprint):
+        self.sector = sector
+        self.model = model
+        self.encoders = encoders
+        self.features = list(features)
+        self.metadata = metadata
+        self.source = source
+        self.fingerprint = fingerprint
+        self.version = str(metadata.get('model_version') or fingerprint)
+        self.lookups = compile_lookups(encoders)
+        self.schema = compile_schema(self.features, self.lookups, SECTORS.get(sector), metadata)
+        self.reference_predictor = compile_row_predictor(model, len(self.features))
+        # The reference until prepare_bundle has verified the configured backend
+        self.row_predictor = self.reference_predictor
+        self.backend = {'backend': 'xgboost' if self.reference_predictor else 'dataframe'}
+        self.contrib_predictor = compile_contrib_predictor(model, len(self.features))
+        self.generation = 0
+        self.loaded_at = time.time()
+        # Optional precomputed WageGrid, attached by prepare_bundle before publishing,
+        # and the reason it was not built when grids are enabled
+        self.grid = None
+        self.grid_error = None
+        self.prepared = False
+    
+    def describe(self):
+        """Version information for /health and admin responses"""
+        return {
+            'version': self.version,
+            'generation': self.generation,
+            'source': self.source,
+            'backend': self.backend,
+            'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.loaded_at))
+        }
+
+def register_reload_hook(callback):
+    """Register callback(sector_name), called whenever a sector's model is (re)loaded"""
+    reload_hooks.append(callback)
+    return callback
+
+def register_bundle_preparer(callback):
+    """Register callback(bundle), run on every serving bundle before it is published"""
+    bundle_preparers.append(callback)
+    return callback
+
+def select_bundle_backend(bundle):
+    """
+    Switch an unpublished bundle to PREDICTOR_BACKEND if it compiles and
+    matches the XGBoost reference on BACKEND_CHECK_ROWS generated rows
+    """
+    if PREDICTOR_BACKEND == 'xgboost':
+        return
+    check_matrix = check_rows(
+        len(bundle.features), bundle.lookups, bundle.schema.ranges, bundle.features, BACKEND_CHECK_ROWS
+    )
+    bundle.row_predictor, bundle.backend = select_backend(
+        PREDICTOR_BACKEND, bundle.model, bundle.reference_predictor, check_matrix,
+        BACKEND_TOLERANCE, BACKEND_BUILD_DIR, f'{bundle.sector}-{bundle.fingerprint}', BACKEND_MAX_ROWS
+    )
+
+def prepare_bundle(bundle, serving=True):
+    """Select the backend of an unpublished bundle and run the steps that make predictions on it"""
+    select_bundle_backend(bundle)
+    if serving:
+        for preparer in bundle_preparers:
+            preparer(bundle)
+    bundle.prepared = True
+    return bundle
+
+def prepare_loaded_bundles():
+    """
+    Prepare copies of the bundles (and shadows) a preloading master loaded
+    unprepared and swap each in, unless a newer version was loaded meanwhile.
+    Requests keep using the unprepared bundles until then.
+    """
+    for bundle in list(bundles.values()):
+        if not bundle.prepared:
+            publish_bundle(prepare_bundle(copy.copy(bundle)), replaces=bundle)
+    
+    for sector, shadow in list(shadow_bundles.items()):
+        if not shadow.prepared:
+            prepared = prepare_bundle(copy.copy(shadow), serving=False)
+            if shadow_bundles.get(sector) is shadow:
+                shadow_bundles[sector] = prepared
+                shadow_status[sector] = {**shadow_status.get(sector, {}), **prepared.describe()}
+
+def native_store_path(model_dir):
+    """Path of a sector's native model store sidecar"""
+    return os.path.join(model_dir, NATIVE_STORE_FILE)
+
+def sector_files_exist(model_dir, file_config):
+    """Check that a sector's model directory holds the critical files"""
+    if not os.path.isdir(model_dir):
+        return False
+    if os.path.exists(native_store_path(model_dir)):
+        return True
+    return all(
+        os.path.exists(os.path.join(model_dir, file_config[key]))
+        for key in ['model', 'encoders', 'features']
+    )
+
+def sector_source_files(model_dir, file_config):
+    """Files a sector is loaded from: the native store if present, else the pickles"""
+    sidecar_path = native_store_path(model_dir)
+    if PREFER_NATIVE_MODELS and os.path.exists(sidecar_path):
+        with open(sidecar_path) as f:
+            model_file = json.load(f)['model_file']
+        return [sidecar_path, os.path.join(model_dir, model_file)]
+    return pickle_source_files(model_dir, file_config)
+
+def pickle_source_files(model_dir, file_config):
+    """The pickled files of a sector that exist"""
+    return [
+        os.path.join(model_dir, file_config[key])
+        for key in ['model', 'encoders', 'features', 'metadata']
+        if os.path.exists(os.path.join(model_dir, file_config[key]))
+    ]
+
+def file_fingerprint(paths):
+    """Short content hash identifying a model version"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def load_pickle_artifacts(model_dir, file_config):
+    """
+    Load a sector's pickled model, encoders, features and metadata.
+    Returns: (model, encoders, feature_names, metadata)
+    """
+    model = joblib.load(os.path.join(model_dir, file_config['model']))
+    sector_encoders = joblib.load(os.path.join(model_dir, file_config['encoders']))
+    feature_names = joblib.load(os.path.join(model_dir, file_config['features']))
+    
+    # Load metadata if exists (an unreadable metadata file is not fatal)
+    sector_metadata = {}
+    metadata_path = os.path.join(model_dir, file_config['metadata'])
+    if os.path.exists(metadata_path):
+        try:
+            sector_metadata = joblib.load(metadata_path)
+        except Exception:
+            sector_metadata = {}
+    
+    return model, sector_encoders, feature_names, sector_metadata
+
+def load_native_artifacts(model_dir):
+    """
+    Load a sector exported by export_models.py: the booster in XGBoost's
+    native format plus a JSON sidecar with encoder classes, features and metadata.
+    Returns: (model, encoders, feature_names, metadata)
+    """
+    with open(native_store_path(model_dir)) as f:
+        store = json.load(f)
+    
+    model = xgb.XGBRegressor()
+    model.load_model(os.path.join(model_dir, store['model_file']))
+    
+    # Rebuild fitted LabelEncoders so get_encoders() keeps its interface
+    sector_encoders = {}
+    for col, classes in store['encoders'].items():
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(classes, dtype=object)
+        sector_encoders[col] = encoder
+    
+    return model, sector_encoders, store['features'], store.get('metadata', {})
+
+def build_bundle(sector_name, model_dir, file_config, serving=True):
+    """
+    Load a sector from disk into a new, unpublished SectorBundle,
+    preferring the native store over the pickles (which are still used
+    if the store cannot be read), and prepare it unless
+    preparation is deferred. Bundles that will not serve requests (serving
+    False, e.g. shadows) skip the registered preparers. Raises on failure.
+    """
+    if not sector_files_exist(model_dir, file_config):
+        raise FileNotFoundError(f"Model files for '{sector_name}' not found in {model_dir}")
+    
+    artifacts = None
+    if PREFER_NATIVE_MODELS and os.path.exists(native_store_path(model_dir)):
+        try:
+            source_files = sector_source_files(model_dir, file_config)
+            artifacts, source = load_native_artifacts(model_dir), 'native'
+        except Exception as e:
+            logger.warning("Native model store of %s in %s is unreadable, loading the pickles: %s", sector_name, model_dir, e)
+    if artifacts is None:
+        source_files = pickle_source_files(model_dir, file_config)
+        artifacts, source = load_pickle_artifacts(model_dir, file_config), 'pickle'
+    
+    model, sector_encoders, feature_names, sector_metadata = artifacts
+    pin_model_threads(model, sector_limit(sector_name, 'nthread', MODEL_NTHREAD))
+    
+    # A registered sector's model must match the schema in its manifest
+    spec = SECTORS.get(sector_name)
+    if spec is not None:
+        is_valid, error = spec.check_features(feature_names, sector_encoders)
+        if not is_valid:
+            raise ValueError(error)
+    
+    bundle = SectorBundle(
+        sector_name, model, sector_encoders, feature_names, sector_metadata or {},
+        source, file_fingerprint(source_files)
+    )
+    if not defer_preparation:
+        prepare_bundle(bundle, serving)
+    return bundle
+
+def publish_bundle(bundle, replaces=None):
+    """
+    Atomically make a bundle the active version of its sector. With replaces,
+    only if that bundle is still the active one. Returns True if published.
+    """
+    with publish_lock:
+        if replaces is not None and bundles.get(bundle.sector) is not replaces:
             return False
-        
-        # Load files
-        models[sector_name] = joblib.load(model_path)
-        encoders[sector_name] = joblib.load(encoder_path)
-        features[sector_name] = joblib.load(features_path)
-        
-        # Load metadata if exists
-        if os.path.exists(metadata_path):
-            metadata[sector_name] = joblib.load(metadata_path)
-        else:
-            metadata[sector_name] = {}
-        
+        bundle.generation = generations.get(bundle.sector, 0) + 1
+        generations[bundle.sector] = bundle.generation
+        bundles[bundle.sector] = bundle
+    
+    for hook in reload_hooks:
+        hook(bundle.sector)
+    return True
+
+def load_sector_model(sector_name, model_dir, file_config):
+    """Load models for a specific sector"""
+    try:
+        publish_bundle(build_bundle(sector_name, model_dir, file_config))
         return True
     
     except Exception as e:
         return False
 
-def initialize_models():
-    """Initialize all models"""
-    load_sector_model('agriculture', AGRICULTURE_MODEL_DIR, AGRICULTURE_FILES)
-    load_sector_model('construction', CONSTRUCTION_MODEL_DIR, CONSTRUCTION_FILES)
+def load_shadow_model(sector, model_dir, file_config=None):
+    """
+    Load a candidate model as the shadow of a sector, replacing any previous
+    shadow. Requests are still answered by the active bundle.
+    Returns: (success, status)
+    """
+    if sector not in SECTOR_SOURCES:
+        return False, {'state': 'failed', 'error': f"Unknown sector '{sector}'. Available: {list(SECTOR_SOURCES)}"}
+    
+    file_config = file_config or SECTOR_SOURCES[sector][1]
+    try:
+        bundle = build_bundle(sector, model_dir, file_config, serving=False)
+    except Exception as e:
+        active = shadow_bundles.get(sector)
+        shadow_status[sector] = {
+            'state': 'failed',
+            'model_dir': model_dir,
+            'error': str(e),
+            'active_version': active.version if active else None
+        }
+        return False, shadow_status[sector]
+    
+    shadow_bundles[sector] = bundle
+    shadow_status[sector] = {'state': 'ok', 'model_dir': model_dir, **bundle.describe()}
+    return True, shadow_status[sector]
+
+def clear_shadow_model(sector):
+    """Stop shadow scoring for a sector. Returns True if it had a shadow."""
+    shadow_status.pop(sector, None)
+    return shadow_bundles.pop(sector, None) is not None
+
+def get_shadow(sector):
+    """Get the shadow SectorBundle of a sector (None if it has none)"""
+    return shadow_bundles.get(sector)
+
+def ensure_loaded(sector):
+    """
+    Load a sector on first use. Thread-safe; each sector is attempted once.
+    Returns True if the sector's model is loaded.
+    """
+    if sector in bundles:
+        return True
+    if sector not in SECTOR_SOURCES:
+        return False
+    
+    with load_locks[sector]:
+        if sector not in load_attempted:
+            load_attempted.add(sector)
+            model_dir, file_config = SECTOR_SOURCES[sector]
+            spec = SECTORS.get(sector)
+            if load_sector_model(sector, model_dir, file_config) and spec and spec.shadow:
+                load_shadow_model(sector, spec.shadow['model_dir'], spec.shadow['files'])
+    
+    return sector in bundles
+
+def initialize_models(sectors=None):
+    """
+    Initialize the given sectors, by default all of them (or only the
+    warm-up sectors in lazy mode). Sectors load in parallel; each is still
+    attempted only once.
+    """
+    if sectors is None:
+        sectors = WARMUP_SECTORS if LAZY_MODEL_LOADING else list(SECTOR_SOURCES)
+    if sectors:
+        with ThreadPoolExecutor(max_workers=max(1, min(MODEL_LOAD_WORKERS, len(sectors)))) as pool:
+            list(pool.map(ensure_loaded, sectors))
     
-    available_sectors = [k for k, v in models.items() if v is not None]
+    available_sectors = [sector for sector in SECTOR_SOURCES if sector in bundles]
     return available_sectors
 
+def is_loaded(sector):
+    """Check whether a sector's model is in memory, without loading it"""
+    return sector in bundles
+
+def available_sectors():
+    """Sectors that are loaded or can be loaded from disk"""
+    return [
+        sector for sector, (model_dir, file_config) in SECTOR_SOURCES.items()
+        if is_loaded(sector) or sector_files_exist(model_dir, file_config)
+    ]
+
+def get_bundle(sector):
+    """Get the active SectorBundle for a sector (None if not available)"""
+    ensure_loaded(sector)
+    return bundles.get(sector)
+
 def get_model(sector):
     """Get model for a sector"""
-    return models.get(sector)
+    bundle = get_bundle(sector)
+    return bundle.model if bundle else None
+
+def get_version(sector):
+    """Get the active model version of a loaded sector, without loading it"""
+    bundle = bundles.get(sector)
+    return bundle.version if bundle else None
 
 def get_encoders(sector):
     """Get encoders for a sector"""
-    return encoders.get(sector)
+    bundle = get_bundle(sector)
+    return bundle.encoders if bundle else None
+
+def get_lookups(sector):
+    """Get compiled categorical lookup tables for a sector"""
+    bundle = get_bundle(sector)
+    return bundle.lookups if bundle else None
 
 def get_features(sector):
     """Get feature names for a sector"""
-    return features.get(sector)
+    bundle = get_bundle(sector)
+    return bundle.features if bundle else None
 
 def get_metadata(sector):
     """Get metadata for a sector"""
-    return metadata.get(sector, {})
\ No newline at end of file
+    bundle = get_bundle(sector)
+    return bundle.metadata if bundle else {}
\ No newline at end of file
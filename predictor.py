@@ -2,63 +2,352 @@
 Wage prediction logic
 """
 
+import logging
+import time
+import numpy as np
 import pandas as pd
-from models import get_model, get_encoders, get_features
-from validators import validate_input
+from audit import audit_prediction
+from cache import LRUCache
+from coalescer import RequestCoalescer
+from config import (
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, TIMEOUT,
+    COALESCE_ENABLED, COALESCE_WINDOW_MS, COALESCE_MAX_ROWS,
+    GRID_ENABLED, GRID_MAX_CELLS, GRID_NUMERIC_VALUES,
+    SHADOW_ENABLED, SHADOW_SAMPLE_RATE, SHADOW_MAX_QUEUE, SHADOW_BATCH_SIZE,
+    SHADOW_FLUSH_INTERVAL, SHADOW_WINDOW
+)
+from grid import build_grid
+from metrics import record_error, record_stage
+from models import (
+    SectorOverloaded, get_bundle, lookup_code, normalize_value,
+    register_bundle_preparer, register_reload_hook, run_in_sector
+)
+from shadow import ShadowScorer
+from validators import validate_batch, validate_sector, validate_sweep
 
-def predict_wage(sector, data):
+logger = logging.getLogger(__name__)
+
+# Predictions keyed on (sector, model generation, encoded feature tuple)
+prediction_cache = LRUCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+@register_reload_hook
+def _invalidate_sector_cache(sector):
+    prediction_cache.invalidate(lambda key: key[0] == sector)
+
+# Functions taking a bundle work on one model version (models.SectorBundle),
+# so a request keeps using the version it started with across a reload.
+
+def cache_key(bundle, data):
+    """
+    Canonical cache key for a record: categorical values as their encoded
+    integers and numeric values as floats, in model feature order.
+    Returns None when the record cannot be canonicalized (it then takes
+    the normal validation path and reports its own error).
+    """
+    if not isinstance(data, dict):
+        return None
+    
+    tables = bundle.lookups
+    key = []
+    for col in bundle.features:
+        if col not in data:
+            return None
+        table = tables.get(col)
+        if table is None:
+            if isinstance(data[col], bool):
+                return None
+            try:
+                key.append(float(data[col]))
+            except (TypeError, ValueError):
+                return None
+        else:
+            encoded = lookup_code(table, data[col])
+            if encoded is None:
+                return None
+            key.append(encoded)
+    
+    return (bundle.sector, bundle.generation, tuple(key))
+
+def wage_estimates(prediction):
+    """Daily wage with monthly and annual estimates"""
+    return {
+        'predicted_wage': round(prediction, 2),
+        'monthly_estimate': round(prediction * 26, 2),
+        'annual_estimate': round(prediction * 312, 2)
+    }
+
+def predict_dataframe(bundle, rows):
+    """Predict encoded feature rows through a pandas DataFrame"""
+    df = pd.DataFrame(rows, columns=bundle.features)
+    return bundle.model.predict(df)
+
+def predict_encoded(bundle, rows):
+    """
+    Predict encoded feature rows (a list of rows or a 2D array in model order).
+    Rows go straight into a float32 matrix unless the model needs a DataFrame.
+    """
+    if bundle.row_predictor is None:
+        return predict_dataframe(bundle, rows)
+    return bundle.row_predictor(np.asarray(rows, dtype=np.float32))
+
+def predict_admitted(bundle, rows):
+    """Predict encoded rows under the sector's concurrency limit"""
+    return run_in_sector(bundle.sector, predict_encoded, bundle, rows)
+
+# Concurrent single-row predictions share one model call per window, and
+# that call takes one slot of the sector's executor for the whole batch
+coalescer = (
+    RequestCoalescer(predict_admitted, COALESCE_WINDOW_MS, COALESCE_MAX_ROWS)
+    if COALESCE_ENABLED else None
+)
+
+# Sampled single predictions are re-scored by the sector's shadow model, if it has one
+shadow_scorer = (
+    ShadowScorer(
+        predict_encoded, SHADOW_SAMPLE_RATE, SHADOW_MAX_QUEUE,
+        SHADOW_BATCH_SIZE, SHADOW_FLUSH_INTERVAL, SHADOW_WINDOW
+    )
+    if SHADOW_ENABLED else None
+)
+
+def predict_row(bundle, row):
+    """
+    Predict one encoded row, coalescing with concurrent callers when enabled.
+    Raises SectorOverloaded when the sector is saturated.
+    """
+    if coalescer is None:
+        return float(predict_admitted(bundle, [row])[0])
+    
+    # Convert before queueing so a bad value only fails its own request
+    matrix = np.asarray([row], dtype=np.float32)
+    try:
+        return coalescer.predict(bundle.sector, bundle, matrix, timeout=TIMEOUT)
+    except TimeoutError as e:
+        raise SectorOverloaded(str(e)) from None
+
+@register_bundle_preparer
+def _precompute_grid(bundle):
+    """Score the wage grid once for a bundle about to be published"""
+    if GRID_ENABLED:
+        bundle.grid, bundle.grid_error = build_grid(bundle, predict_encoded, GRID_NUMERIC_VALUES, GRID_MAX_CELLS)
+        if bundle.grid_error:
+            logger.warning("No wage grid for %s version %s: %s", bundle.sector, bundle.version, bundle.grid_error)
+
+def build_result(bundle, prediction, data, echo_input=True, estimates=True):
+    """Build the single prediction response, optionally without estimates or input echo"""
+    result = {'success': True, 'predicted_wage': round(prediction, 2), 'sector': bundle.sector}
+    if estimates:
+        wage = wage_estimates(prediction)
+        result['monthly_estimate'] = wage['monthly_estimate']
+        result['annual_estimate'] = wage['annual_estimate']
+    result['model_version'] = bundle.version
+    if echo_input:
+        result['input_data'] = data
+    return result
+
+def predict_wage(sector, data, echo_input=True, estimates=True):
     """
     Predict wage for given sector and worker data
+    echo_input and estimates control whether the response repeats the
+    input and carries the monthly/annual estimates.
     Returns: (success, result_or_error)
     """
     try:
-        # Validate input
-        is_valid, result = validate_input(sector, data)
-        if not is_valid:
-            return False, result
-        
-        # Prepare DataFrame
-        df = pd.DataFrame([data])
-        
-        # Get encoders and encode categorical variables
-        encoders = get_encoders(sector)
-        categorical_cols = list(encoders.keys())
+        # Pin the model version for the whole request
+        bundle = get_bundle(sector)
+        if bundle is None:
+            return validate_sector(sector)
         
-        for col in categorical_cols:
-            if col in df.columns:
-                original_value = df[col].values[0]
-                if isinstance(original_value, str):
-                    original_value = original_value.strip()
-                
-                try:
-                    encoded = encoders[col].transform([original_value])[0]
-                    df[col] = int(encoded)
-                except ValueError as e:
-                    return False, f"Encoding error for {col}: {str(e)}"
+        # Repeated inputs are answered from the prediction cache
+        start = time.perf_counter()
+        key = cache_key(bundle, data) if prediction_cache.enabled else None
+        if key is not None:
+            cached = prediction_cache.get(key)
+            record_stage(sector, 'cache', start)
+            if cached is not None:
+                audit_prediction(bundle, data, key[2], cached)
+                if shadow_scorer is not None:
+                    shadow_scorer.submit(bundle, data, key[2], cached)
+                return True, build_result(bundle, cached, data, echo_input, estimates)
         
-        # Ensure correct feature order
-        feature_names = get_features(sector)
-        df = df[feature_names]
+        # Validate, coerce and encode the record in one pass
+        start = time.perf_counter()
+        is_valid, row = bundle.schema.parse(data)
+        record_stage(sector, 'validate', start)
+        if not is_valid:
+            record_error(sector, 'validate')
+            return False, row
         
-        # Make prediction
-        model = get_model(sector)
-        prediction = float(model.predict(df)[0])
+        # Make prediction: a table lookup for grid points, the model otherwise
+        start = time.perf_counter()
+        prediction = bundle.grid.lookup(row) if bundle.grid is not None else None
+        if prediction is not None:
+            record_stage(sector, 'grid', start)
+        else:
+            prediction = predict_row(bundle, row)
+            record_stage(sector, 'predict', start)
         
         # Ensure non-negative prediction
         if prediction < 0:
             prediction = 0
         
-        # Calculate estimates
-        result = {
+        if key is not None:
+            prediction_cache.put(key, prediction)
+        
+        audit_prediction(bundle, data, row, prediction)
+        if shadow_scorer is not None:
+            shadow_scorer.submit(bundle, data, row, prediction)
+        return True, build_result(bundle, prediction, data, echo_input, estimates)
+    
+    except SectorOverloaded:
+        record_error(sector, 'overloaded')
+        raise
+    
+    except Exception as e:
+        record_error(sector, 'exception')
+        return False, str(e)
+
+def encode_batch(bundle, records, rows):
+    """Encode the given validated records into one float32 matrix in model order"""
+    tables = bundle.lookups
+    matrix = np.empty((len(rows), len(bundle.features)), dtype=np.float32)
+    
+    for j, col in enumerate(bundle.features):
+        values = [records[i][col] for i in rows]
+        if col in tables:
+            codes = tables[col]['codes']
+            values = [codes[normalize_value(v)] for v in values]
+        else:
+            # Numeric strings were accepted by validation; coerce them the same way
+            values = [float(v) for v in values]
+        matrix[:, j] = values
+    
+    return matrix
+
+def predict_records(bundle, records, index_offset=0, estimates=True):
+    """
+    Validate, encode and predict a list of records with a single model call.
+    Returns one result dict per record, in order; invalid records carry their
+    error instead of failing the others. estimates=False leaves out the
+    monthly and annual estimates.
+    """
+    sector = bundle.sector
+    
+    # Validate every column of the batch at once
+    start = time.perf_counter()
+    is_valid, row_errors = validate_batch(sector, records, bundle)
+    record_stage(sector, 'batch_validate', start)
+    if not is_valid:
+        record_error(sector, 'batch_validate')
+        raise ValueError(row_errors)
+    
+    valid_rows = [i for i, error in enumerate(row_errors) if error is None]
+    predictions = {}
+    
+    if valid_rows:
+        # Encode each column of the batch into one feature matrix
+        start = time.perf_counter()
+        matrix = encode_batch(bundle, records, valid_rows)
+        record_stage(sector, 'batch_encode', start)
+        
+        # Predict the whole batch at once
+        start = time.perf_counter()
+        wages = np.maximum(predict_encoded(bundle, matrix), 0)
+        record_stage(sector, 'batch_predict', start)
+        predictions = dict(zip(valid_rows, wages.tolist()))
+    
+    results = []
+    for i, error in enumerate(row_errors):
+        if error is None:
+            wage = wage_estimates(predictions[i]) if estimates else {'predicted_wage': round(predictions[i], 2)}
+            results.append({'index': index_offset + i, 'success': True, **wage})
+        else:
+            results.append({'index': index_offset + i, 'success': False, 'error': error})
+    
+    return results
+
+def predict_wage_batch(sector, records, estimates=True):
+    """
+    Predict wages for a batch of worker records with a single model call.
+    Invalid records are reported per row and do not fail the batch.
+    Returns: (success, result_or_error)
+    """
+    try:
+        bundle = get_bundle(sector)
+        if bundle is None:
+            return validate_sector(sector)
+        
+        # The whole batch (validation and encoding too) counts against the sector's limit
+        results = run_in_sector(sector, predict_records, bundle, records, 0, estimates)
+        succeeded = sum(1 for r in results if r['success'])
+        
+        return True, {
             'success': True,
-            'predicted_wage': round(prediction, 2),
             'sector': sector,
-            'monthly_estimate': round(prediction * 26, 2),
-            'annual_estimate': round(prediction * 312, 2),
-            'input_data': data
+            'model_version': bundle.version,
+            'total': len(records),
+            'succeeded': succeeded,
+            'failed': len(records) - succeeded,
+            'results': results
         }
+    
+    except SectorOverloaded:
+        record_error(sector, 'overloaded')
+        raise
+    
+    except Exception as e:
+        record_error(sector, 'exception')
+        return False, str(e)
+
+def sweep_wage(sector, data, field, values=None, value_range=None):
+    """
+    Predict wages for one record while varying a single field, with one
+    model call for the whole curve. Each point matches predict_wage on the
+    record with that field replaced.
+    Returns: (success, result_or_error)
+    """
+    try:
+        bundle = get_bundle(sector)
+        if bundle is None:
+            return validate_sector(sector)
+        
+        is_valid, values = validate_sweep(sector, field, values, value_range, bundle)
+        if not is_valid:
+            record_error(sector, 'validate')
+            return False, values
         
-        return True, result
+        # Validate and encode the base record once; the swept field is filled in per point
+        base = {**data, field: values[0]} if isinstance(data, dict) else data
+        is_valid, row = bundle.schema.parse(base)
+        if not is_valid:
+            record_error(sector, 'validate')
+            return False, row
+        
+        start = time.perf_counter()
+        matrix = np.tile(np.asarray(row, dtype=np.float32), (len(values), 1))
+        table = bundle.lookups.get(field)
+        matrix[:, bundle.features.index(field)] = (
+            [lookup_code(table, v) for v in values] if table is not None else values
+        )
+        wages = np.maximum(run_in_sector(sector, predict_encoded, bundle, matrix), 0)
+        record_stage(sector, 'sweep', start)
+        
+        return True, {
+            'success': True,
+            'sector': sector,
+            'model_version': bundle.version,
+            'field': field,
+            'points': [
+                {'value': normalize_value(value), **wage_estimates(wage)}
+                for value, wage in zip(values, wages.tolist())
+            ],
+            'input_data': data
+        }
+    
+    except SectorOverloaded:
+        record_error(sector, 'overloaded')
+        raise
     
     except Exception as e:
-        return False, str(e)
\ No newline at end of file
+        record_error(sector, 'exception')
+        return False, str(e)
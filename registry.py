@@ -0,0 +1,111 @@
+"""
+Sector registry: the sectors this process serves, read from manifest files
+"""
+
+import json
+import os
+from config import SECTOR_MANIFESTS
+
+# Model file names used when a manifest entry does not override them
+DEFAULT_FILES = {
+    'model': 'model.pkl',
+    'encoders': 'label_encoders.pkl',
+    'features': 'feature_names.pkl',
+    'metadata': 'model_metadata.pkl'
+}
+
+class SectorSpec:
+    """
+    One manifest entry: where a sector's model lives, its numeric feature
+    schema with allowed ranges, the sample payload used for smoke tests,
+    optional inference limits and an optional shadow model.
+    Everything derived from the entry is computed once, at registration.
+    """
+    
+    def __init__(self, name, model_dir, files=None, label=None, icon='',
+                 numeric_fields=None, sample_payload=None, limits=None, shadow=None):
+        self.name = name
+        self.model_dir = model_dir
+        self.files = {**DEFAULT_FILES, **(files or {})}
+        self.label = label or name.replace('_', ' ').title()
+        self.icon = icon
+        self.numeric_ranges = {
+            field: (bounds.get('min'), bounds.get('max'))
+            for field, bounds in (numeric_fields or {}).items()
+        }
+        self.numeric_fields = list(self.numeric_ranges)
+        self.sample_payload = sample_payload
+        # Optional per-sector overrides of concurrency, max_queue and nthread
+        self.limits = dict(limits or {})
+        # Optional shadow model scored alongside the live one: {'model_dir', 'files'}
+        self.shadow = shadow
+    
+    def check_features(self, features, categorical_fields):
+        """
+        Check a loaded model against the declared schema.
+        Returns: (is_valid, error_message)
+        """
+        if not self.numeric_ranges:
+            return True, None
+        
+        numeric = [col for col in features if col not in categorical_fields]
+        if set(numeric) != set(self.numeric_fields):
+            return False, (
+                f"Model numeric features {numeric} do not match the manifest "
+                f"for '{self.name}': {self.numeric_fields}"
+            )
+        return True, None
+
+def parse_entry(entry, base_dir):
+    """Build a SectorSpec from a manifest entry; model_dir is relative to the manifest"""
+    if not isinstance(entry, dict) or not entry.get('name') or not entry.get('model_dir'):
+        raise ValueError(f"Manifest entries need a name and a model_dir: {entry!r}")
+    
+    name = entry['name'].lower().strip()
+    
+    # A shadow model defaults to the sector's own file names
+    shadow = entry.get('shadow')
+    if shadow is not None:
+        if not isinstance(shadow, dict) or not shadow.get('model_dir'):
+            raise ValueError(f"Shadow of '{name}' needs a model_dir: {shadow!r}")
+        shadow = {
+            'model_dir': os.path.join(base_dir, shadow['model_dir']),
+            'files': {**DEFAULT_FILES, **(entry.get('files') or {}), **(shadow.get('files') or {})}
+        }
+    
+    return SectorSpec(
+        name,
+        os.path.join(base_dir, entry['model_dir']),
+        files=entry.get('files'),
+        label=entry.get('label'),
+        icon=entry.get('icon', ''),
+        numeric_fields=entry.get('numeric_fields'),
+        sample_payload=entry.get('sample_payload'),
+        limits=entry.get('limits'),
+        shadow=shadow
+    )
+
+def load_manifests(paths):
+    """
+    Read sector manifests in order. A later manifest may add sectors or
+    replace earlier entries of the same name.
+    Returns: {sector_name: SectorSpec}
+    """
+    sectors = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        
+        base_dir = os.path.dirname(path)
+        for entry in manifest.get('sectors', []):
+            spec = parse_entry(entry, base_dir)
+            sectors[spec.name] = spec
+    
+    return sectors
+
+# All registered sectors, in manifest order
+SECTORS = load_manifests(SECTOR_MANIFESTS)
+
+def get_spec(sector):
+    """Get the registry entry for a sector (None if not registered)"""
+    return SECTORS.get(sector)
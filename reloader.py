@@ -0,0 +1,140 @@
+"""
+Hot model reload: load a new sector version in the background,
+smoke-test it and swap it in without interrupting predictions
+"""
+
+import math
+import os
+import threading
+import time
+from background import ProcessThread
+from models import (
+    SECTOR_SOURCES, build_bundle, publish_bundle, get_version,
+    is_loaded, sector_source_files
+)
+from predictor import predict_encoded
+from registry import get_spec
+
+# Last reload outcome per sector
+reload_status = {}
+reload_locks = {sector: threading.Lock() for sector in SECTOR_SOURCES}
+
+def timestamp():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+def smoke_test(bundle):
+    """
+    Score the sector's sample payload with a candidate bundle.
+    Returns: (success, prediction_or_error)
+    """
+    spec = get_spec(bundle.sector)
+    sample = spec.sample_payload if spec else None
+    if sample is None:
+        return False, f"No sample payload for '{bundle.sector}'"
+    
+    is_valid, row = bundle.schema.parse(sample)
+    if not is_valid:
+        return False, row
+    
+    prediction = float(predict_encoded(bundle, [row])[0])
+    if not math.isfinite(prediction):
+        return False, f"Smoke prediction is not finite: {prediction}"
+    
+    return True, prediction
+
+def reload_sector(sector, model_dir=None):
+    """
+    Load, smoke-test and atomically publish a new version of a sector.
+    Requests already in flight finish on the bundle they started with.
+    Returns: (success, status)
+    """
+    if sector not in SECTOR_SOURCES:
+        return False, {'state': 'failed', 'error': f"Unknown sector '{sector}'. Available: {list(SECTOR_SOURCES)}"}
+    
+    lock = reload_locks[sector]
+    if not lock.acquire(blocking=False):
+        return False, {'state': 'busy', 'error': f"Reload of '{sector}' already in progress"}
+    
+    try:
+        default_dir, file_config = SECTOR_SOURCES[sector]
+        model_dir = model_dir or default_dir
+        reload_status[sector] = {'state': 'loading', 'model_dir': model_dir, 'started_at': timestamp()}
+        
+        try:
+            bundle = build_bundle(sector, model_dir, file_config)
+            is_healthy, smoke = smoke_test(bundle)
+            if not is_healthy:
+                raise ValueError(f"Smoke test failed: {smoke}")
+        except Exception as e:
+            reload_status[sector] = {
+                'state': 'failed',
+                'model_dir': model_dir,
+                'error': str(e),
+                'active_version': get_version(sector),
+                'finished_at': timestamp()
+            }
+            return False, reload_status[sector]
+        
+        previous_version = get_version(sector)
+        publish_bundle(bundle)
+        reload_status[sector] = {
+            'state': 'ok',
+            'model_dir': model_dir,
+            'previous_version': previous_version,
+            'smoke_prediction': round(smoke, 2),
+            'finished_at': timestamp(),
+            **bundle.describe()
+        }
+        return True, reload_status[sector]
+    
+    finally:
+        lock.release()
+
+def reload_sector_async(sector, model_dir=None):
+    """Run reload_sector on a background thread"""
+    worker = threading.Thread(
+        target=reload_sector, args=(sector, model_dir), name=f'reload-{sector}', daemon=True
+    )
+    worker.start()
+    return worker
+
+def source_signature(sector):
+    """(path, mtime, size) of every file a sector loads from, or None if unreadable"""
+    model_dir, file_config = SECTOR_SOURCES[sector]
+    try:
+        return tuple(
+            (path, os.stat(path).st_mtime_ns, os.stat(path).st_size)
+            for path in sector_source_files(model_dir, file_config)
+        )
+    except (OSError, ValueError, KeyError):
+        return None
+
+def watch_models(interval):
+    """
+    Poll loaded sectors' model files and reload on change. A change is only
+    acted on once the files have been stable for a full interval, so a
+    half-copied model is never picked up.
+    """
+    seen = {sector: source_signature(sector) for sector in SECTOR_SOURCES}
+    pending = set()
+    
+    while True:
+        time.sleep(interval)
+        for sector in SECTOR_SOURCES:
+            if not is_loaded(sector):
+                # Lazy sectors read the current files when first used
+                continue
+            
+            signature = source_signature(sector)
+            if signature != seen[sector]:
+                seen[sector] = signature
+                pending.add(sector)
+            elif sector in pending and signature is not None:
+                pending.discard(sector)
+                reload_sector(sector)
+
+model_watcher = ProcessThread(watch_models, 'model-watcher')
+
+def start_model_watcher(interval):
+    """Start this process's file watcher if it is not running yet"""
+    model_watcher.start(interval)
@@ -0,0 +1,114 @@
+"""
+Replay audit logs against the current (or a candidate) model to measure drift
+
+    python replay_audit.py audit_logs/*.ndjson.gz
+    python replay_audit.py audit_logs/*.ndjson.gz --sector construction --model-dir retrained/
+
+Logged inputs are re-encoded with the replay model's own encoders, so a
+retrained model with new categorical classes can be compared directly.
+Records the replay model rejects are counted, not scored.
+"""
+
+import argparse
+import gzip
+import json
+
+import numpy as np
+
+from models import SECTOR_SOURCES, build_bundle, get_bundle
+from predictor import predict_encoded
+
+def iter_audit_records(paths):
+    """Audit records from gzip NDJSON files, in order"""
+    for path in paths:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def replay_bundle(sector, model_dir=None):
+    """The bundle to replay against: a candidate model directory, or the active model"""
+    if model_dir is None:
+        return get_bundle(sector)
+    _, file_config = SECTOR_SOURCES[sector]
+    return build_bundle(sector, model_dir, file_config)
+
+def replay(paths, sectors=None, model_dir=None, chunk_size=10000):
+    """
+    Re-score logged predictions in chunks, one model call per chunk.
+    Returns per-sector drift statistics.
+    """
+    state = {}
+    
+    def score(sector):
+        entry = state[sector]
+        if entry['rows']:
+            replayed = np.maximum(predict_encoded(entry['bundle'], entry['rows']), 0)
+            entry['diffs'].append(replayed - np.asarray(entry['logged']))
+            entry['rows'], entry['logged'] = [], []
+    
+    for record in iter_audit_records(paths):
+        sector = record.get('sector')
+        if sectors and sector not in sectors:
+            continue
+        if sector not in state:
+            bundle = replay_bundle(sector, model_dir) if sector in SECTOR_SOURCES else None
+            state[sector] = {
+                'bundle': bundle, 'rows': [], 'logged': [], 'diffs': [],
+                'records': 0, 'rejected': 0, 'logged_versions': {}
+            }
+        
+        entry = state[sector]
+        entry['records'] += 1
+        version = record.get('model_version')
+        entry['logged_versions'][version] = entry['logged_versions'].get(version, 0) + 1
+        
+        is_valid, row = entry['bundle'].schema.parse(record.get('input')) if entry['bundle'] else (False, None)
+        if not is_valid:
+            entry['rejected'] += 1
+            continue
+        
+        entry['rows'].append(row)
+        entry['logged'].append(record['prediction'])
+        if len(entry['rows']) >= chunk_size:
+            score(sector)
+    
+    report = {}
+    for sector, entry in state.items():
+        score(sector)
+        diffs = np.concatenate(entry['diffs']) if entry['diffs'] else np.empty(0)
+        abs_diffs = np.abs(diffs)
+        report[sector] = {
+            'replay_version': entry['bundle'].version if entry['bundle'] else None,
+            'logged_versions': entry['logged_versions'],
+            'records': entry['records'],
+            'rejected': entry['rejected'],
+            'scored': int(diffs.size),
+            'mean_diff': round(float(diffs.mean()), 4) if diffs.size else None,
+            'mean_abs_diff': round(float(abs_diffs.mean()), 4) if diffs.size else None,
+            'p50_abs_diff': round(float(np.percentile(abs_diffs, 50)), 4) if diffs.size else None,
+            'p95_abs_diff': round(float(np.percentile(abs_diffs, 95)), 4) if diffs.size else None,
+            'max_abs_diff': round(float(abs_diffs.max()), 4) if diffs.size else None
+        }
+    
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay audit logs against a model to measure drift')
+    parser.add_argument('files', nargs='+', help='Audit log files (.ndjson.gz)')
+    parser.add_argument('--sector', action='append', help='Only replay these sectors (repeatable)')
+    parser.add_argument('--model-dir', help='Candidate model directory (needs --sector with one sector)')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+    
+    if args.model_dir and (not args.sector or len(args.sector) != 1):
+        parser.error('--model-dir replays a single sector: pass exactly one --sector')
+    for sector in args.sector or []:
+        if sector not in SECTOR_SOURCES:
+            parser.error(f"Unknown sector '{sector}'. Available: {list(SECTOR_SOURCES)}")
+    
+    report = replay(args.files, args.sector, args.model_dir, args.chunk_size)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,121 @@
 API Routes for Labour Wage Prediction
 """
 
-from flask import Blueprint, request, jsonify, render_template_string
-from models import get_model, get_encoders, get_features, get_metadata
+import hashlib
+import hmac
+import time
+from flask import (
+    Blueprint, Response, current_app, g, request, jsonify,
+    render_template_string, stream_with_context
+)
+from audit import audit_stats
+from metrics import record_request, record_stage, render_metrics
+from models import (
+    get_features, is_loaded, available_sectors, bundles, get_bundle,
+    SectorOverloaded, executor_stats, load_shadow_model, clear_shadow_model, shadow_status
+)
+from registry import SECTORS
 from validators import validate_sector
-from predictor import predict_wage
+from fastjson import loads as json_loads
+from predictor import predict_wage, predict_wage_batch, sweep_wage, prediction_cache, shadow_scorer
+from explainer import explain_wage, explain_wage_batch
+from reloader import reload_sector, reload_sector_async, reload_locks, reload_status, start_model_watcher
+from streaming import stream_predictions
+from config import MAX_BATCH_SIZE, ADMIN_TOKEN, MODEL_WATCH_INTERVAL, STREAM_CHUNK_SIZE, GRID_ENABLED, TIMEOUT
 from templates import HTML_TEMPLATE
 
 api = Blueprint('api', __name__)
 
+@api.before_app_request
+def start_background_services():
+    """Start per-process background threads on the first request (after any fork)"""
+    if MODEL_WATCH_INTERVAL > 0:
+        start_model_watcher(MODEL_WATCH_INTERVAL)
+
+def metrics_sector(sector):
+    """Sector label for metrics, bounded to known sectors"""
+    return sector if sector in SECTORS else 'other'
+
+@api.before_app_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@api.after_app_request
+def record_request_metrics(response):
+    """Count every request and record its latency by endpoint and sector"""
+    start = g.get('request_start')
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        sector = g.get('sector') or (request.view_args or {}).get('sector', '')
+        record_request(endpoint, metrics_sector(sector.lower().strip()) if sector else '-', response.status_code, start)
+    return response
+
+def read_json():
+    """Decode the request body with the fastest available JSON parser (None if absent or invalid)"""
+    body = request.get_data(cache=False)
+    if not body:
+        return None
+    try:
+        return json_loads(body)
+    except ValueError:
+        return None
+
+def response_options(payload):
+    """
+    Optional response trimming from a request's "options" object:
+    echo_input (default true) and estimates (default true).
+    Returns: (is_valid, options_or_error)
+    """
+    options = payload.get('options') or {}
+    if not isinstance(options, dict):
+        return False, 'Options must be an object'
+    
+    parsed = {}
+    for name in ('echo_input', 'estimates'):
+        value = options.get(name, True)
+        if not isinstance(value, bool):
+            return False, f"Option '{name}' must be true or false"
+        parsed[name] = value
+    return True, parsed
+
+def overloaded_response(error):
+    """
+    503 for a saturated sector, so clients back off instead of retrying at once.
+    Retry-After is the time a queued call may wait for its sector (API_TIMEOUT).
+    """
+    response = jsonify({'error': str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, TIMEOUT))
+    return response
+
+# ==========================================
+# PRECOMPUTED RESPONSES
+# ==========================================
+
+# name -> (key, body, etag); rebuilt only when the key changes
+precomputed_responses = {}
+
+def model_state_key():
+    """Changes whenever any sector is loaded or reloaded"""
+    return tuple(sorted((sector, bundle.generation) for sector, bundle in list(bundles.items())))
+
+def precomputed_response(name, key, build, mimetype='application/json'):
+    """
+    Serve a response body built once per key with a strong ETag,
+    answering a matching If-None-Match with 304 Not Modified.
+    build() returns the payload (serialized as JSON) or bytes.
+    """
+    entry = precomputed_responses.get(name)
+    if entry is None or entry[0] != key:
+        payload = build()
+        body = payload if isinstance(payload, bytes) else (current_app.json.dumps(payload) + '\n').encode('utf-8')
+        entry = (key, body, hashlib.sha256(body).hexdigest()[:32])
+        precomputed_responses[name] = entry
+    
+    response = Response(entry[1], mimetype=mimetype)
+    response.set_etag(entry[2])
+    return response.make_conditional(request)
+
 # ==========================================
 # FRONTEND ROUTE
 # ==========================================
@@ -17,7 +124,9 @@ api = Blueprint('api', __name__)
 @api.route('/', methods=['GET'])
 def home():
     """Serve HTML frontend for testing"""
-    return render_template_string(HTML_TEMPLATE)
+    return precomputed_response(
+        'home', None, lambda: render_template_string(HTML_TEMPLATE).encode('utf-8'), 'text/html'
+    )
 
 # ==========================================
 # HEALTH & INFO ROUTES
@@ -26,43 +135,147 @@ def home():
 @api.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
+    return precomputed_response('health', model_state_key(), build_health)
+
+def build_health():
+    available = available_sectors()
+    return {
         'status': 'healthy',
-        'models_loaded': {
-            'agriculture': get_model('agriculture') is not None,
-            'construction': get_model('construction') is not None
+        'models_loaded': {sector: is_loaded(sector) for sector in SECTORS},
+        'models_available': {
+            sector: 'loaded' if is_loaded(sector) else 'not_loaded'
+            for sector in available
+        },
+        'model_versions': {
+            sector: bundle.describe() for sector, bundle in list(bundles.items())
         }
-    }), 200
+    }
 
 @api.route('/api/sectors', methods=['GET'])
 def get_sectors():
     """Get list of available sectors"""
-    available = [s for s in ['agriculture', 'construction'] if get_model(s) is not None]
-    return jsonify({'sectors': available}), 200
+    return precomputed_response(
+        'sectors', model_state_key(), lambda: {'sectors': available_sectors()}
+    )
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """Latency histograms and counters in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Prediction cache hit/miss/eviction counters"""
+    return jsonify(prediction_cache.stats()), 200
+
+@api.route('/api/executors/stats', methods=['GET'])
+def executors_stats():
+    """Per-sector inference executor load: in flight, rejected and timed out calls"""
+    return jsonify(executor_stats()), 200
+
+@api.route('/api/audit/stats', methods=['GET'])
+def audit_log_stats():
+    """Audit log queue depth, dropped records and flush latency"""
+    return jsonify(audit_stats()), 200
+
+@api.route('/api/shadow/stats', methods=['GET'])
+def shadow_divergence_stats():
+    """Shadow model divergence per sector: mean and percentile differences, by categorical value"""
+    return jsonify(shadow_scorer.stats() if shadow_scorer is not None else {'enabled': False}), 200
+
+@api.route('/api/grid/<sector>', methods=['GET'])
+def wage_grid(sector):
+    """
+    Wage table from the precomputed grid, cut by one or two dimensions.
+    Query: by=<field>[,<field>], agg=mean|min|max, and <field>=<value> to pin others
+    """
+    sector = sector.lower().strip()
+    
+    # Validate sector
+    is_valid, error = validate_sector(sector)
+    if not is_valid:
+        return jsonify({'error': error}), 400
+    
+    bundle = get_bundle(sector)
+    grid = bundle.grid
+    if grid is None:
+        if GRID_ENABLED and not bundle.prepared:
+            return jsonify({'error': f"The grid for '{sector}' is still being built, retry shortly"}), 503
+        if bundle.grid_error:
+            return jsonify({'error': f"No precomputed grid for '{sector}': {bundle.grid_error}"}), 404
+        return jsonify({'error': f"No precomputed grid for '{sector}' (set GRID_ENABLED)"}), 404
+    
+    by = [col.strip() for col in request.args.get('by', '').split(',') if col.strip()]
+    agg = request.args.get('agg', 'mean')
+    if not 1 <= len(by) <= 2 or len(set(by)) != len(by) or any(col not in grid.features for col in by):
+        return jsonify({'error': f"'by' must name one or two different fields of {grid.features}"}), 400
+    if agg not in ('mean', 'min', 'max'):
+        return jsonify({'error': 'agg must be mean, min or max'}), 400
+    
+    # Pin dimensions given as query parameters to one grid label
+    fixed = {}
+    for col in grid.features:
+        if col in request.args and col not in by:
+            raw = request.args[col].strip()
+            labels = grid.labels[col]
+            matches = [label for label in labels if str(label) == raw]
+            if not matches:
+                return jsonify({'error': f"Invalid value '{raw}' for field '{col}'. Grid values: {labels}"}), 400
+            fixed[col] = matches[0]
+    
+    labels, values = grid.cut(by, fixed, agg)
+    return jsonify({
+        'sector': sector,
+        'model_version': bundle.version,
+        'by': by,
+        'fixed': fixed,
+        'aggregate': agg,
+        'labels': labels,
+        'values': values
+    }), 200
 
 @api.route('/api/config', methods=['GET'])
 def get_config():
-    """Get sector configuration for frontend"""
-    config = {}
-    
-    for sector in ['agriculture', 'construction']:
-        if get_model(sector) is None:
-            continue
-        
-        encoders = get_encoders(sector)
-        config[sector] = {
-            'name': sector.capitalize(),
-            'icon': '🌾' if sector == 'agriculture' else '🏗️',
-            'metadata': get_metadata(sector),
-            'categorical_fields': list(encoders.keys()) if encoders else [],
-            'numerical_fields': ['age', 'experience_years', 'skill_level', 'working_hours'],
-            'valid_values': {
-                col: list(encoders[col].classes_)
-                for col in (encoders.keys() if encoders else [])
-            }
-        }
+    """
+    Get sector configuration for frontend, serialized once per model version.
+    Sectors not loaded yet are described from their manifest only (loaded
+    false, no metadata or valid values), so this never loads a lazy sector.
+    """
+    return precomputed_response('config', model_state_key(), build_config)
+
+@api.route('/api/config/<sector>', methods=['GET'])
+def get_sector_config(sector):
+    """Get one sector's full configuration, loading the sector if needed"""
+    sector = sector.lower().strip()
+    
+    # Validate sector (loads it on first use)
+    is_valid, error = validate_sector(sector)
+    if not is_valid:
+        return jsonify({'error': error}), 400
     
-    return jsonify(config), 200
+    bundle = get_bundle(sector)
+    return precomputed_response(
+        f'config:{sector}', bundle.generation, lambda: sector_config(SECTORS[sector], bundle)
+    )
+
+def sector_config(spec, bundle=None):
+    """A sector's frontend configuration; without a bundle, only what its manifest declares"""
+    config = {'name': spec.label, 'icon': spec.icon, 'loaded': bundle is not None}
+    if bundle is not None:
+        config['metadata'] = bundle.metadata
+        config['categorical_fields'] = list(bundle.encoders.keys())
+    config['numerical_fields'] = spec.numeric_fields
+    config['numeric_ranges'] = spec.numeric_ranges
+    if bundle is not None:
+        config['valid_values'] = {col: list(encoder.classes_) for col, encoder in bundle.encoders.items()}
+    return config
+
+def build_config():
+    available = available_sectors()
+    return {
+        sector: sector_config(spec, bundles.get(sector))
+        for sector, spec in SECTORS.items() if sector in available
+    }
 
 # ==========================================
 # PREDICTION ROUTES
@@ -72,13 +285,16 @@ def get_config():
 def predict():
     """Main prediction endpoint"""
     try:
-        payload = request.get_json()
+        start = time.perf_counter()
+        payload = read_json()
         
         if not payload:
             return jsonify({'error': 'No data provided'}), 400
         
         sector = payload.get('sector', '').lower().strip()
         data = payload.get('data', {})
+        g.sector = sector
+        record_stage(metrics_sector(sector), 'parse', start)
         
         if not sector or not data:
             return jsonify({'error': 'Missing sector or data in request'}), 400
@@ -88,17 +304,208 @@ def predict():
         if not is_valid:
             return jsonify({'error': error}), 400
         
+        is_valid, options = response_options(payload)
+        if not is_valid:
+            return jsonify({'error': options}), 400
+        
         # Predict
-        success, result = predict_wage(sector, data)
+        success, result = predict_wage(sector, data, options['echo_input'], options['estimates'])
+        
+        if success:
+            return jsonify(result), 200
+        else:
+            return jsonify({'error': result}), 400
+    
+    except SectorOverloaded as e:
+        return overloaded_response(e)
+    
+    except Exception as e:
+        return jsonify({'error': f"Server error: {str(e)}"}), 500
+
+@api.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """Batch prediction endpoint with per-record results"""
+    try:
+        start = time.perf_counter()
+        payload = read_json()
+        
+        if not payload:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        sector = payload.get('sector', '').lower().strip()
+        records = payload.get('records', [])
+        g.sector = sector
+        record_stage(metrics_sector(sector), 'batch_parse', start)
+        
+        if not sector or not records:
+            return jsonify({'error': 'Missing sector or records in request'}), 400
+        
+        if not isinstance(records, list):
+            return jsonify({'error': 'Records must be a list'}), 400
+        
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large: {len(records)} records (max {MAX_BATCH_SIZE})'}), 413
+        
+        # Validate sector
+        is_valid, error = validate_sector(sector)
+        if not is_valid:
+            return jsonify({'error': error}), 400
+        
+        is_valid, options = response_options(payload)
+        if not is_valid:
+            return jsonify({'error': options}), 400
+        
+        # Predict
+        success, result = predict_wage_batch(sector, records, options['estimates'])
+        
+        if success:
+            return jsonify(result), 200
+        else:
+            return jsonify({'error': result}), 400
+    
+    except SectorOverloaded as e:
+        return overloaded_response(e)
+    
+    except Exception as e:
+        return jsonify({'error': f"Server error: {str(e)}"}), 500
+
+@api.route('/api/predict/sweep', methods=['POST'])
+def predict_sweep():
+    """What-if curve: vary one field of a record over a list or range of values"""
+    try:
+        payload = read_json()
+        
+        if not payload:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        sector = payload.get('sector', '').lower().strip()
+        data = payload.get('data', {})
+        field = payload.get('field', '')
+        g.sector = sector
+        
+        if not sector or not data or not field:
+            return jsonify({'error': 'Missing sector, data or field in request'}), 400
+        
+        # Validate sector
+        is_valid, error = validate_sector(sector)
+        if not is_valid:
+            return jsonify({'error': error}), 400
+        
+        success, result = sweep_wage(sector, data, field, payload.get('values'), payload.get('range'))
+        
+        if success:
+            return jsonify(result), 200
+        else:
+            return jsonify({'error': result}), 400
+    
+    except SectorOverloaded as e:
+        return overloaded_response(e)
+    
+    except Exception as e:
+        return jsonify({'error': f"Server error: {str(e)}"}), 500
+
+@api.route('/api/explain', methods=['POST'])
+def explain():
+    """Prediction with per-feature SHAP contributions"""
+    try:
+        payload = read_json()
+        
+        if not payload:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        sector = payload.get('sector', '').lower().strip()
+        data = payload.get('data', {})
+        g.sector = sector
+        
+        if not sector or not data:
+            return jsonify({'error': 'Missing sector or data in request'}), 400
+        
+        # Validate sector
+        is_valid, error = validate_sector(sector)
+        if not is_valid:
+            return jsonify({'error': error}), 400
+        
+        success, result = explain_wage(sector, data)
+        
+        if success:
+            return jsonify(result), 200
+        else:
+            return jsonify({'error': result}), 400
+    
+    except SectorOverloaded as e:
+        return overloaded_response(e)
+    
+    except Exception as e:
+        return jsonify({'error': f"Server error: {str(e)}"}), 500
+
+@api.route('/api/explain/batch', methods=['POST'])
+def explain_batch():
+    """Batch SHAP explanations with per-record results"""
+    try:
+        payload = read_json()
+        
+        if not payload:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        sector = payload.get('sector', '').lower().strip()
+        records = payload.get('records', [])
+        g.sector = sector
+        
+        if not sector or not records:
+            return jsonify({'error': 'Missing sector or records in request'}), 400
+        
+        if not isinstance(records, list):
+            return jsonify({'error': 'Records must be a list'}), 400
+        
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large: {len(records)} records (max {MAX_BATCH_SIZE})'}), 413
+        
+        # Validate sector
+        is_valid, error = validate_sector(sector)
+        if not is_valid:
+            return jsonify({'error': error}), 400
+        
+        success, result = explain_wage_batch(sector, records)
         
         if success:
             return jsonify(result), 200
         else:
             return jsonify({'error': result}), 400
     
+    except SectorOverloaded as e:
+        return overloaded_response(e)
+    
     except Exception as e:
         return jsonify({'error': f"Server error: {str(e)}"}), 500
 
+@api.route('/api/predict/stream/<sector>', methods=['POST'])
+def predict_stream(sector):
+    """
+    Bulk scoring of a (chunked) CSV or NDJSON upload, streamed back as NDJSON or CSV.
+    Input format: ?format=csv|ndjson or the Content-Type; output: ?output=ndjson|csv
+    """
+    sector = sector.lower().strip()
+    
+    # Validate sector
+    is_valid, error = validate_sector(sector)
+    if not is_valid:
+        return jsonify({'error': error}), 400
+    
+    content_type = request.mimetype or ''
+    input_format = request.args.get('format') or ('csv' if 'csv' in content_type else 'ndjson')
+    output_format = request.args.get('output', 'ndjson')
+    if input_format not in ('csv', 'ndjson') or output_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'Formats must be csv or ndjson'}), 400
+    
+    # The whole upload is scored with the version active when it started
+    bundle = get_bundle(sector)
+    body = stream_predictions(bundle, request.stream, input_format, output_format, STREAM_CHUNK_SIZE)
+    mimetype = 'text/csv' if output_format == 'csv' else 'application/x-ndjson'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['X-Model-Version'] = bundle.version
+    return response
+
 @api.route('/api/test/<sector>', methods=['GET'])
 def test_prediction(sector):
     """Test endpoint with pre-configured data"""
@@ -109,40 +516,107 @@ def test_prediction(sector):
     if not is_valid:
         return jsonify({'error': error}), 400
     
-    test_data = {
-        'agriculture': {
-            'age': 35,
-            'experience_years': 15,
-            'education_level': 'secondary',
-            'occupation': 'tractor operator',
-            'skill_level': 3,
-            'state': 'MH',
-            'working_hours': 9,
-            'employment_type': 'permanent'
-        },
-        'construction': {
-            'age': 32,
-            'experience_years': 10,
-            'education_level': 'diploma',
-            'job_role': 'electrician',
-            'skill_level': 3,
-            'city_tier': 'Metro',
-            'working_hours': 8,
-            'employment_type': 'contract',
-            'project_type': 'commercial'
-        }
-    }
-    
-    if sector not in test_data:
+    sample = SECTORS[sector].sample_payload if sector in SECTORS else None
+    if sample is None:
         return jsonify({'error': f'No test data for {sector}'}), 400
     
-    success, result = predict_wage(sector, test_data[sector])
+    success, result = predict_wage(sector, sample)
     
     if success:
         return jsonify(result), 200
     else:
         return jsonify({'error': result}), 400
 
+# ==========================================
+# ADMIN ROUTES
+# ==========================================
+
+def check_admin_token():
+    """Return an error response unless the request carries the admin token"""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin endpoints are disabled (set ADMIN_TOKEN)'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({'error': 'Invalid admin token'}), 401
+    return None
+
+@api.route('/api/admin/reload/<sector>', methods=['POST'])
+def reload_model(sector):
+    """Load a new model version in the background, smoke-test it and swap it in"""
+    denied = check_admin_token()
+    if denied:
+        return denied
+    
+    sector = sector.lower().strip()
+    options = request.get_json(silent=True) or {}
+    model_dir = options.get('model_dir')
+    
+    if sector not in reload_locks:
+        return jsonify({'error': f"Unknown sector '{sector}'"}), 404
+    
+    if reload_locks[sector].locked():
+        return jsonify({'error': f"Reload of '{sector}' already in progress"}), 409
+    
+    # Synchronous reload when the caller wants the outcome in the response
+    if options.get('wait'):
+        success, status = reload_sector(sector, model_dir)
+        if success:
+            return jsonify(status), 200
+        return jsonify(status), 409 if status['state'] == 'busy' else 500
+    
+    reload_sector_async(sector, model_dir)
+    return jsonify({'status': 'reloading', 'sector': sector}), 202
+
+@api.route('/api/admin/reload/<sector>', methods=['GET'])
+def reload_model_status(sector):
+    """Outcome of the last reload of a sector"""
+    denied = check_admin_token()
+    if denied:
+        return denied
+    
+    sector = sector.lower().strip()
+    return jsonify(reload_status.get(sector, {'state': 'never_reloaded'})), 200
+
+@api.route('/api/admin/shadow/<sector>', methods=['POST'])
+def load_shadow(sector):
+    """Load a candidate model directory as a sector's shadow model"""
+    denied = check_admin_token()
+    if denied:
+        return denied
+    
+    sector = sector.lower().strip()
+    options = request.get_json(silent=True) or {}
+    model_dir = options.get('model_dir')
+    if not model_dir:
+        return jsonify({'error': 'model_dir is required'}), 400
+    
+    if sector not in SECTORS:
+        return jsonify({'error': f"Unknown sector '{sector}'"}), 404
+    
+    success, status = load_shadow_model(sector, model_dir)
+    return jsonify(status), 200 if success else 500
+
+@api.route('/api/admin/shadow/<sector>', methods=['GET'])
+def shadow_model_status(sector):
+    """Outcome of the last shadow model load of a sector"""
+    denied = check_admin_token()
+    if denied:
+        return denied
+    
+    sector = sector.lower().strip()
+    return jsonify(shadow_status.get(sector, {'state': 'none'})), 200
+
+@api.route('/api/admin/shadow/<sector>', methods=['DELETE'])
+def remove_shadow(sector):
+    """Stop shadow scoring for a sector"""
+    denied = check_admin_token()
+    if denied:
+        return denied
+    
+    sector = sector.lower().strip()
+    if not clear_shadow_model(sector):
+        return jsonify({'error': f"'{sector}' has no shadow model"}), 404
+    return jsonify({'status': 'removed', 'sector': sector}), 200
+
 # ==========================================
 # ERROR HANDLERS
 # ==========================================
@@ -157,4 +631,8 @@ def method_not_allowed(error):
 
 @api.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+    return jsonify({'error': 'Internal server error'}), 500
+
+@api.errorhandler(SectorOverloaded)
+def sector_overloaded(error):
+    return overloaded_response(error)
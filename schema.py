@@ -0,0 +1,103 @@
+"""
+Compiled request schema: decode, coerce and validate a record in one pass
+"""
+
+import math
+
+class SectorSchema:
+    """
+    Per-sector schema compiled from a model's features, its categorical
+    lookup tables and the numeric ranges declared for the sector.
+    parse() turns a request record straight into the encoded feature row
+    the model takes (categorical codes and floats, in model order).
+    """
+    
+    __slots__ = ('features', 'fields', 'ranges', 'by_name')
+    
+    def __init__(self, features, lookups, ranges):
+        self.features = list(features)
+        self.ranges = {col: ranges[col] for col in self.features if col in ranges and col not in lookups}
+        
+        # (name, lookup table or None, low, high) per feature, in model order
+        self.fields = []
+        for col in self.features:
+            low, high = self.ranges.get(col, (None, None))
+            self.fields.append((col, lookups.get(col), low, high))
+        self.by_name = {field[0]: field for field in self.fields}
+    
+    def check_number(self, col, value, low, high):
+        """
+        Coerce a numeric field and check its range.
+        Returns: (is_valid, number_or_error)
+        """
+        if isinstance(value, bool):
+            return False, f"Invalid numeric value '{value}' for field '{col}'"
+        if not isinstance(value, (int, float)):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return False, f"Invalid numeric value '{value}' for field '{col}'"
+        
+        if not math.isfinite(value):
+            return False, f"Invalid numeric value '{value}' for field '{col}'"
+        if (low is not None and value < low) or (high is not None and value > high):
+            return False, f"Value {value} for field '{col}' is out of range [{low}, {high}]"
+        return True, float(value)
+    
+    def check_category(self, col, value, table):
+        """
+        Encode a categorical field.
+        Returns: (is_valid, code_or_error)
+        """
+        value = value.strip() if isinstance(value, str) else value
+        try:
+            code = table['codes'].get(value)
+        except TypeError:
+            code = None
+        if code is None:
+            return False, f"Invalid value '{value}' for field '{col}'. Valid options: {table['classes']}"
+        return True, code
+    
+    def check_field(self, col, value):
+        """
+        Validate and encode one field's value with the same rules as parse().
+        Returns: (is_valid, encoded_value_or_error)
+        """
+        _, table, low, high = self.by_name[col]
+        if table is None:
+            return self.check_number(col, value, low, high)
+        return self.check_category(col, value, table)
+    
+    def parse(self, data):
+        """
+        Validate and encode a record in one pass.
+        Returns: (is_valid, row_or_error_message)
+        """
+        if not isinstance(data, dict):
+            return False, "Data must be an object"
+        
+        missing = [col for col in self.features if col not in data]
+        if missing:
+            return False, f"Missing required fields: {missing}"
+        
+        row = []
+        for col, table, low, high in self.fields:
+            if table is None:
+                is_valid, value = self.check_number(col, data[col], low, high)
+            else:
+                is_valid, value = self.check_category(col, data[col], table)
+            if not is_valid:
+                return False, value
+            row.append(value)
+        
+        return True, row
+
+def compile_schema(features, lookups, spec=None, metadata=None):
+    """
+    Compile a sector's schema. Numeric ranges come from the sector's registry
+    entry, or from 'numeric_ranges' in the model metadata if it has none.
+    """
+    ranges = dict(spec.numeric_ranges) if spec is not None and spec.numeric_ranges else {}
+    if not ranges and isinstance(metadata, dict) and isinstance(metadata.get('numeric_ranges'), dict):
+        ranges = {col: tuple(bounds) for col, bounds in metadata['numeric_ranges'].items()}
+    return SectorSchema(features, lookups, ranges)
@@ -0,0 +1,206 @@
+"""
+Shadow model evaluation: a sampled fraction of live predictions is re-scored
+by the sector's shadow model in batches on a background thread, and the
+difference from the live model is summarized per sector and categorical value
+"""
+
+import copy
+import queue
+import random
+import threading
+import time
+from collections import deque
+import numpy as np
+from background import ProcessThread, process_batches
+from models import get_shadow, shadow_status
+
+def divergence_summary(diffs):
+    """Mean and percentile differences of shadow minus live predictions"""
+    abs_diffs = np.abs(diffs)
+    return {
+        'count': int(diffs.size),
+        'mean_diff': round(float(diffs.mean()), 4),
+        'mean_abs_diff': round(float(abs_diffs.mean()), 4),
+        'p50_abs_diff': round(float(np.percentile(abs_diffs, 50)), 4),
+        'p95_abs_diff': round(float(np.percentile(abs_diffs, 95)), 4),
+        'p99_abs_diff': round(float(np.percentile(abs_diffs, 99)), 4),
+        'max_abs_diff': round(float(abs_diffs.max()), 4)
+    }
+
+class SectorDivergence:
+    """
+    Divergence between one live and one shadow model version of a sector.
+    Counters cover every scored record; percentiles and the breakdown by
+    categorical value cover the last `window` records.
+    """
+    
+    def __init__(self, primary, shadow, window):
+        self.primary_version = primary.version
+        self.shadow_version = shadow.version
+        self.categorical = [col for col in primary.features if col in primary.lookups]
+        self.scored = 0
+        self.rejected = 0
+        self.errors = 0
+        self.diffs = deque(maxlen=window)
+        self.labels = deque(maxlen=window)
+    
+    def matches(self, primary, shadow):
+        return self.primary_version == primary.version and self.shadow_version == shadow.version
+    
+    def snapshot(self):
+        """Copy of the counters and window, so the summary can be computed outside a lock"""
+        snapshot = copy.copy(self)
+        snapshot.diffs = list(self.diffs)
+        snapshot.labels = list(self.labels)
+        return snapshot
+    
+    def summary(self):
+        result = {
+            'primary_version': self.primary_version,
+            'shadow_version': self.shadow_version,
+            'scored': self.scored,
+            'rejected': self.rejected,
+            'errors': self.errors
+        }
+        if not self.diffs:
+            return result
+        
+        diffs = np.fromiter(self.diffs, dtype=np.float64, count=len(self.diffs))
+        result['window'] = divergence_summary(diffs)
+        
+        # Group the window by each categorical field's value
+        by_value = {}
+        for j, col in enumerate(self.categorical):
+            groups = {}
+            for i, labels in enumerate(self.labels):
+                groups.setdefault(labels[j], []).append(i)
+            by_value[col] = {
+                str(value): divergence_summary(diffs[rows])
+                for value, rows in sorted(groups.items(), key=lambda item: str(item[0]))
+            }
+        result['by_value'] = by_value
+        return result
+
+class ShadowScorer:
+    """
+    Queues sampled predictions and scores them with the shadow model off the
+    request path. The request only pays for a random draw and a non-blocking
+    put; a full queue drops the sample instead of slowing the request down.
+    """
+    
+    def __init__(self, predict_fn, sample_rate=0.1, max_queue=10000,
+                 batch_size=256, flush_interval=0.5, window=10000):
+        self.predict_fn = predict_fn
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.window = window
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = ProcessThread(self._run, 'shadow-scorer')
+        self._sectors = {}
+        self.submitted = 0
+        self.dropped = 0
+        self.batches = 0
+        self.score_seconds = 0.0
+    
+    def submit(self, bundle, data, row, prediction):
+        """Queue a live prediction for shadow scoring if sampled. Returns True if queued."""
+        shadow = get_shadow(bundle.sector)
+        if shadow is None or random.random() >= self.sample_rate:
+            return False
+        
+        self.start()
+        try:
+            self._queue.put_nowait((bundle, shadow, data, row, prediction))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        
+        with self._lock:
+            self.submitted += 1
+        return True
+    
+    def start(self):
+        """Start this process's scoring thread if it is not running yet"""
+        self._worker.start()
+    
+    def _run(self):
+        process_batches(self._queue, self.score, self.batch_size, self.flush_interval)
+    
+    def score(self, batch):
+        """Score a batch with one shadow model call per (live, shadow) version pair"""
+        start = time.perf_counter()
+        groups = {}
+        for primary, shadow, data, row, prediction in batch:
+            groups.setdefault((primary, shadow), []).append((data, row, prediction))
+        
+        for (primary, shadow), items in groups.items():
+            self.score_group(primary, shadow, items)
+        
+        with self._lock:
+            self.batches += 1
+            self.score_seconds += time.perf_counter() - start
+    
+    def score_group(self, primary, shadow, items):
+        # Rows encoded for the live model are reused when the shadow encodes the same way;
+        # otherwise the logged input is re-encoded with the shadow's own schema
+        same_encoding = shadow.features == primary.features and shadow.lookups == primary.lookups
+        categorical = [
+            (j, primary.lookups[col]['classes'])
+            for j, col in enumerate(primary.features) if col in primary.lookups
+        ]
+        
+        rows, live, labels = [], [], []
+        for data, row, prediction in items:
+            shadow_row = row
+            if not same_encoding:
+                is_valid, shadow_row = shadow.schema.parse(data)
+                if not is_valid:
+                    continue
+            rows.append(shadow_row)
+            live.append(prediction)
+            labels.append(tuple(classes[int(row[j])] for j, classes in categorical))
+        
+        errors = 0
+        diffs = []
+        if rows:
+            try:
+                shadow_wages = np.maximum(self.predict_fn(shadow, rows), 0)
+                diffs = (np.asarray(shadow_wages, dtype=np.float64) - np.asarray(live, dtype=np.float64)).tolist()
+            except Exception:
+                errors, labels = len(rows), []
+        
+        with self._lock:
+            entry = self._sectors.get(primary.sector)
+            if entry is None or not entry.matches(primary, shadow):
+                # A new live or shadow version starts its statistics afresh
+                entry = SectorDivergence(primary, shadow, self.window)
+                self._sectors[primary.sector] = entry
+            entry.scored += len(diffs)
+            entry.rejected += len(items) - len(rows)
+            entry.errors += errors
+            entry.diffs.extend(diffs)
+            entry.labels.extend(labels)
+    
+    def stats(self):
+        with self._lock:
+            counters = {
+                'enabled': True,
+                'sample_rate': self.sample_rate,
+                'queue_depth': self._queue.qsize(),
+                'max_queue': self._queue.maxsize,
+                'submitted': self.submitted,
+                'dropped': self.dropped,
+                'batches': self.batches,
+                'mean_batch_ms': round(self.score_seconds / self.batches * 1000, 3) if self.batches else 0.0
+            }
+            snapshots = {sector: entry.snapshot() for sector, entry in self._sectors.items()}
+        
+        # Percentiles are computed outside the lock so scoring is never held up
+        return {
+            **counters,
+            'shadow_models': dict(shadow_status),
+            'sectors': {sector: snapshot.summary() for sector, snapshot in snapshots.items()}
+        }
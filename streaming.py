@@ -0,0 +1,164 @@
+"""
+Streaming bulk scoring of CSV / NDJSON uploads in fixed-size chunks
+"""
+
+import codecs
+import csv
+import io
+import itertools
+import json
+from models import SectorOverloaded, run_in_sector
+from predictor import predict_records
+
+RESULT_FIELDS = ['index', 'id', 'success', 'predicted_wage', 'monthly_estimate', 'annual_estimate', 'error']
+
+def iter_lines(stream, chunk_size=65536):
+    """Yield decoded lines (with their newline) from a binary stream, one read at a time"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+    
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+def coerce_numbers(bundle, record):
+    """Turn numeric feature strings (from CSV) into numbers; leave bad values for validation"""
+    for col in bundle.features:
+        value = record.get(col)
+        if col in bundle.lookups or not isinstance(value, str):
+            continue
+        try:
+            number = float(value)
+        except ValueError:
+            continue
+        record[col] = int(number) if number.is_integer() else number
+    return record
+
+def iter_csv_records(bundle, lines):
+    """Records from CSV lines with a header row: (record_or_error, id)"""
+    for row in csv.DictReader(lines):
+        row.pop(None, None)
+        yield coerce_numbers(bundle, row), row.get('id')
+
+def iter_ndjson_records(bundle, lines):
+    """
+    Records from NDJSON lines: (record_or_error, id).
+    A line is either a bare record or an /api/predict style object with the
+    record under 'data' (so logged request bodies can be replayed as-is).
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield f"Invalid JSON: {e}", None
+            continue
+        
+        if not isinstance(item, dict):
+            yield "Record must be an object", None
+            continue
+        
+        record_id = item.get('id', item.get('request_id'))
+        if isinstance(item.get('data'), dict):
+            sector = str(item.get('sector', bundle.sector)).lower().strip()
+            if sector != bundle.sector:
+                yield f"Record is for sector '{sector}', not '{bundle.sector}'", record_id
+                continue
+            item = item['data']
+        yield item, record_id
+
+def chunked(items, size):
+    """Group an iterator into lists of at most size items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def score_stream(bundle, items, chunk_size):
+    """
+    Score (record_or_error, id) items chunk by chunk, yielding one result per item.
+    SectorOverloaded on the first chunk is raised; on a later chunk every
+    row of that chunk gets the overload as its error, so the output still
+    has one result per input row and the failed rows can be resubmitted.
+    """
+    offset = 0
+    for chunk in chunked(items, chunk_size):
+        # Rows that already failed to parse are passed through as errors
+        records = [item for item, _ in chunk if not isinstance(item, str)]
+        try:
+            scored = iter(run_in_sector(bundle.sector, predict_records, bundle, records))
+        except SectorOverloaded as e:
+            if offset == 0:
+                raise
+            error = str(e)
+            scored = ({'success': False, 'error': error} for _ in records)
+        
+        for i, (item, record_id) in enumerate(chunk):
+            if isinstance(item, str):
+                result = {'success': False, 'error': item}
+            else:
+                result = next(scored)
+            result['index'] = offset + i
+            if record_id is not None:
+                result['id'] = record_id
+            yield result
+        offset += len(chunk)
+
+def format_ndjson(results):
+    for result in results:
+        yield json.dumps(result) + '\n'
+
+def format_csv(results, chunk_size):
+    """CSV output, flushed once per chunk of rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=RESULT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    
+    for i, result in enumerate(results, 1):
+        writer.writerow(result)
+        if i % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_predictions(bundle, stream, input_format, output_format, chunk_size):
+    """
+    Parse an upload lazily, score it in chunks of chunk_size rows and yield
+    the output text as it is produced. Memory stays bounded by one chunk.
+    
+    The first chunk is scored before this returns, so a saturated sector
+    raises SectorOverloaded while the request can still fail with a 503;
+    after that, overloaded chunks are reported as error rows.
+    """
+    lines = iter_lines(stream)
+    if input_format == 'csv':
+        items = iter_csv_records(bundle, lines)
+    else:
+        items = iter_ndjson_records(bundle, lines)
+    
+    results = score_stream(bundle, items, chunk_size)
+    first = next(results, None)
+    if first is not None:
+        results = itertools.chain([first], results)
+    
+    if output_format == 'csv':
+        return format_csv(results, chunk_size)
+    return format_ndjson(results)
@@ -154,10 +154,28 @@ HTML_TEMPLATE = """
             document.getElementById('result').innerHTML = '';
         }
 
+        async function loadSectorConfig(sector) {
+            try {
+                const response = await fetch('/api/config/' + sector);
+                const sectorConfig = await response.json();
+                if (!response.ok) throw new Error(sectorConfig.error);
+                config[sector] = sectorConfig;
+                if (sector === currentSector) renderForm();
+            } catch (error) {
+                document.getElementById('result').innerHTML = '<div class="error">Error loading config: ' + error.message + '</div>';
+            }
+        }
+
         function renderForm() {
             const sectorConfig = config[currentSector];
             if (!sectorConfig) return;
 
+            // Sectors not loaded yet only list their valid values once fetched
+            if (!sectorConfig.loaded) {
+                loadSectorConfig(currentSector);
+                return;
+            }
+
             const validValues = sectorConfig.valid_values || {};
             let html = '';
 
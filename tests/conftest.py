@@ -0,0 +1,43 @@
+"""
+Shared test setup
+
+Tests are run from the repository root with the models on disk:
+    python -m pytest tests
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Manifest and model directories are relative to the repository root
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+def random_records(sector, n, seed=0):
+    """Valid records drawn from a sector's encoder classes and manifest ranges"""
+    from models import get_bundle
+    
+    rng = random.Random(seed)
+    bundle = get_bundle(sector)
+    records = []
+    for _ in range(n):
+        record = {}
+        for col in bundle.features:
+            table = bundle.lookups.get(col)
+            if table is not None:
+                record[col] = rng.choice(table['classes'])
+            else:
+                low, high = bundle.schema.ranges.get(col, (None, None))
+                low = 0 if low is None else int(low)
+                record[col] = rng.randint(low, low + 50 if high is None else int(high))
+        records.append(record)
+    return records
+
+@pytest.fixture(params=['agriculture', 'construction'])
+def sector(request):
+    return request.param
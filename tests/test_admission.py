@@ -0,0 +1,38 @@
+"""
+Sector admission limits model calls, not requests waiting for a coalesced batch
+"""
+
+import threading
+
+import models
+import predictor
+from coalescer import RequestCoalescer
+from conftest import random_records
+
+def test_coalesced_batches_take_one_executor_slot(sector, monkeypatch):
+    # One model call at a time and no queue: any request holding a slot while
+    # it waits for its batch would get the others rejected
+    monkeypatch.setattr(models, 'SECTOR_ISOLATION', True)
+    monkeypatch.setitem(models.sector_executors, sector, models.SectorExecutor(sector, 1, 0, 10))
+    monkeypatch.setattr(predictor, 'coalescer', RequestCoalescer(predictor.predict_admitted, 50, 64))
+    monkeypatch.setattr(predictor.prediction_cache, 'maxsize', 0)
+    
+    records = random_records(sector, 16, seed=7)
+    expected = [predictor.predict_wage(sector, record)[1]['predicted_wage'] for record in records]
+    results = [None] * len(records)
+    
+    def call(i):
+        try:
+            results[i] = predictor.predict_wage(sector, records[i])[1]['predicted_wage']
+        except models.SectorOverloaded as e:
+            results[i] = e
+    
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(records))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results == expected
+    assert predictor.coalescer.stats()['mean_batch_size'] > 1
+    assert models.sector_executors[sector].stats()['rejected'] == 0
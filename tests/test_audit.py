@@ -0,0 +1,16 @@
+"""
+Audit sink configuration
+"""
+
+import pytest
+
+from audit import AuditSink
+
+@pytest.mark.parametrize('policy', ['drop', 'block'])
+def test_known_queue_policies_are_accepted(tmp_path, policy):
+    assert AuditSink(str(tmp_path), policy=policy).policy == policy
+
+@pytest.mark.parametrize('policy', ['blocking', 'Drop', ''])
+def test_unknown_queue_policy_is_rejected(tmp_path, policy):
+    with pytest.raises(ValueError, match='Unknown audit queue policy'):
+        AuditSink(str(tmp_path), policy=policy)
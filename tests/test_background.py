@@ -0,0 +1,39 @@
+"""
+Per-process background threads and the batching loop they share
+"""
+
+import multiprocessing
+import queue
+import threading
+
+from background import ProcessThread, process_batches
+
+def start_in_child(thread, results):
+    results.put(thread.start())
+
+def test_thread_starts_once_per_process():
+    resets = []
+    thread = ProcessThread(lambda: None, 'test-thread', on_start=lambda: resets.append(1))
+    
+    assert thread.start()
+    assert not thread.start()
+    assert resets == [1]
+    
+    # A forked child has none of the parent's threads and starts its own
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    child = context.Process(target=start_in_child, args=(thread, results))
+    child.start()
+    child.join(10)
+    assert results.get(timeout=5) is True
+    assert not thread.start()
+
+def test_batches_close_on_size_or_interval():
+    q = queue.Queue()
+    batches = queue.Queue()
+    threading.Thread(target=process_batches, args=(q, batches.put, 3, 0.2), daemon=True).start()
+    
+    for item in range(4):
+        q.put(item)
+    assert batches.get(timeout=5) == [0, 1, 2]
+    assert batches.get(timeout=5) == [3]
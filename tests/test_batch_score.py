@@ -0,0 +1,51 @@
+"""
+End-to-end runs of the offline batch scorer's process pool
+"""
+
+import csv
+import json
+
+import pytest
+
+from batch_score import score_file
+from conftest import random_records
+from predictor import predict_wage
+
+def write_input(path, records):
+    if path.suffix == '.csv':
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(record) + '\n' for record in records)
+
+def read_output(path):
+    with open(path, newline='') as f:
+        if path.suffix == '.csv':
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f]
+
+@pytest.mark.parametrize('ext', ['.csv', '.ndjson'])
+def test_score_file_matches_predict_wage(tmp_path, ext):
+    records = random_records('agriculture', 45)
+    records[7]['age'] = 200
+    for i, record in enumerate(records):
+        record['worker_id'] = f'w{i}'
+    source, output = tmp_path / f'input{ext}', tmp_path / f'scored{ext}'
+    write_input(source, records)
+    
+    rows, failed, seconds = score_file(str(source), 'agriculture', 2, 10, str(output), 'worker_id')
+    
+    assert (rows, failed) == (45, 1)
+    assert seconds > 0
+    results = read_output(output)
+    assert [str(r['index']) for r in results] == [str(i) for i in range(45)]
+    assert [r['worker_id'] for r in results] == [f'w{i}' for i in range(45)]
+    for record, result in zip(records, results):
+        success, expected = predict_wage('agriculture', {k: v for k, v in record.items() if k != 'worker_id'})
+        if success:
+            assert float(result['predicted_wage']) == expected['predicted_wage']
+        else:
+            assert str(result['success']) == 'False' and result['error']
@@ -0,0 +1,25 @@
+"""
+The frontend configuration never loads lazy sectors by itself
+"""
+
+import models
+from app import app
+
+def test_config_lists_unloaded_sectors_from_the_manifest(monkeypatch, sector):
+    monkeypatch.delitem(models.bundles, sector)
+    monkeypatch.setattr(models, 'load_attempted', set())
+    client = app.test_client()
+    
+    entry = client.get('/api/config').get_json()[sector]
+    assert entry['loaded'] is False
+    assert 'valid_values' not in entry and entry['numeric_ranges']
+    assert sector not in models.bundles
+    
+    # Asking for the sector itself loads it
+    full = client.get(f'/api/config/{sector}').get_json()
+    assert full['loaded'] is True and full['valid_values']
+    assert sector in models.bundles
+    assert client.get('/api/config').get_json()[sector] == full
+
+def test_unknown_sector_config_is_rejected():
+    assert app.test_client().get('/api/config/no-such-sector').status_code == 400
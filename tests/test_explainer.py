@@ -0,0 +1,37 @@
+"""
+Explanations report the same wage as predictions
+"""
+
+from conftest import random_records
+from explainer import explain_wage, explain_wage_batch, explanation_cache
+from predictor import predict_wage, predict_wage_batch, prediction_cache
+
+def test_batch_explanations_match_batch_predictions(sector):
+    records = random_records(sector, 2000, seed=1)
+    
+    success, explained = explain_wage_batch(sector, records)
+    assert success
+    success, predicted = predict_wage_batch(sector, records)
+    assert success
+    
+    assert explained['succeeded'] == predicted['succeeded'] == len(records)
+    assert [r['predicted_wage'] for r in explained['results']] == [r['predicted_wage'] for r in predicted['results']]
+
+def test_single_explanations_match_predictions(sector, monkeypatch):
+    # Every call must reach the model rather than either cache
+    monkeypatch.setattr(prediction_cache, 'maxsize', 0)
+    monkeypatch.setattr(explanation_cache, 'maxsize', 0)
+    
+    for record in random_records(sector, 300, seed=2):
+        success, explained = explain_wage(sector, record)
+        assert success
+        success, predicted = predict_wage(sector, record)
+        assert success
+        assert explained['predicted_wage'] == predicted['predicted_wage'], record
+
+def test_cached_explanations_keep_the_model_prediction(sector):
+    record = random_records(sector, 1, seed=3)[0]
+    
+    first = explain_wage(sector, record)[1]
+    second = explain_wage(sector, record)[1]
+    assert first['predicted_wage'] == second['predicted_wage'] == predict_wage(sector, record)[1]['predicted_wage']
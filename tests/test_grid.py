@@ -0,0 +1,78 @@
+"""
+Precomputed wage grid: building before publish and the table endpoint
+"""
+
+import pytest
+
+import predictor
+from app import app
+from models import SECTOR_SOURCES, build_bundle, bundles, get_bundle
+from predictor import predict_encoded
+
+SMALL_VALUES = {
+    'age': [25, 40],
+    'experience_years': [0, 10],
+    'skill_level': [1, 3, 5],
+    'working_hours': [8, 10]
+}
+
+@pytest.fixture
+def grid_enabled(monkeypatch):
+    monkeypatch.setattr(predictor, 'GRID_ENABLED', True)
+    monkeypatch.setattr(predictor, 'GRID_NUMERIC_VALUES', SMALL_VALUES)
+
+@pytest.fixture
+def client(grid_enabled, monkeypatch, sector):
+    active = get_bundle(sector)
+    model_dir, file_config = SECTOR_SOURCES[sector]
+    monkeypatch.setattr(active, 'grid', build_bundle(sector, model_dir, file_config).grid)
+    return app.test_client()
+
+def test_grid_is_built_before_publishing(grid_enabled, sector):
+    model_dir, file_config = SECTOR_SOURCES[sector]
+    bundle = build_bundle(sector, model_dir, file_config)
+    
+    assert bundle.prepared and bundle.grid is not None
+    assert bundles[sector] is not bundle
+    assert bundle.grid.cells == bundle.grid.table.size
+    
+    # Every grid point matches the model
+    point = [0] * len(bundle.features)
+    for j, col in enumerate(bundle.features):
+        if col in SMALL_VALUES:
+            point[j] = SMALL_VALUES[col][-1]
+    expected = max(float(predict_encoded(bundle, [point])[0]), 0)
+    assert bundle.grid.lookup(point) == pytest.approx(expected)
+
+def test_shadow_bundles_skip_the_grid(grid_enabled, sector):
+    model_dir, file_config = SECTOR_SOURCES[sector]
+    assert build_bundle(sector, model_dir, file_config, serving=False).grid is None
+
+def test_grid_endpoint_reports_why_there_is_no_grid(grid_enabled, monkeypatch, sector, caplog):
+    monkeypatch.setattr(predictor, 'GRID_MAX_CELLS', 10)
+    model_dir, file_config = SECTOR_SOURCES[sector]
+    bundle = build_bundle(sector, model_dir, file_config)
+    
+    assert bundle.grid is None and 'more than the limit of 10' in bundle.grid_error
+    assert bundle.grid_error in caplog.text
+    
+    monkeypatch.setattr(get_bundle(sector), 'grid', None)
+    monkeypatch.setattr(get_bundle(sector), 'grid_error', bundle.grid_error)
+    response = app.test_client().get(f'/api/grid/{sector}?by=skill_level')
+    assert response.status_code == 404
+    assert bundle.grid_error in response.get_json()['error']
+
+def test_grid_cut_by_one_field(client, sector):
+    response = client.get(f'/api/grid/{sector}?by=skill_level')
+    
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['labels'] == {'skill_level': [1, 3, 5]}
+    assert len(body['values']) == 3
+
+@pytest.mark.parametrize('by', ['age,age', 'skill_level,skill_level', 'unknown', 'age,unknown', '', 'age,skill_level,working_hours'])
+def test_grid_rejects_bad_dimensions(client, sector, by):
+    response = client.get(f'/api/grid/{sector}?by={by}')
+    
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
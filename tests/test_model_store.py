@@ -0,0 +1,37 @@
+"""
+A corrupt native model store falls back to the pickles
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from config import NATIVE_STORE_FILE
+from models import SECTOR_SOURCES, build_bundle, get_bundle
+
+def write_store(model_dir, features):
+    with open(os.path.join(model_dir, NATIVE_STORE_FILE), 'w') as f:
+        json.dump({'model_file': 'model.ubj', 'encoders': {}, 'features': features}, f)
+    with open(os.path.join(model_dir, 'model.ubj'), 'wb') as f:
+        f.write(b'{not a model')
+
+def truncate_store(model_dir, features):
+    write_store(model_dir, features)
+    with open(os.path.join(model_dir, NATIVE_STORE_FILE), 'w') as f:
+        f.write('{"model_file": "mod')
+
+@pytest.mark.parametrize('corrupt', [write_store, truncate_store])
+def test_unreadable_store_loads_the_pickles(tmp_path, sector, corrupt, caplog):
+    source_dir, file_config = SECTOR_SOURCES[sector]
+    model_dir = str(tmp_path / 'models')
+    shutil.copytree(source_dir, model_dir)
+    corrupt(model_dir, get_bundle(sector).features)
+    
+    bundle = build_bundle(sector, model_dir, file_config, serving=False)
+    
+    assert bundle.source == 'pickle'
+    assert bundle.describe()['source'] == 'pickle'
+    assert bundle.fingerprint == get_bundle(sector).fingerprint
+    assert 'Native model store' in caplog.text
@@ -0,0 +1,52 @@
+"""
+Backend verification runs when a bundle is prepared, never in a preloading master
+"""
+
+import pytest
+
+import models
+from models import SECTOR_SOURCES, build_bundle, prepare_loaded_bundles
+
+@pytest.fixture
+def verifications(monkeypatch):
+    """Use the numpy backend and count the verifications select_backend runs"""
+    calls = []
+    select = models.select_backend
+    
+    def counted(*args, **kwargs):
+        calls.append(args[0])
+        return select(*args, **kwargs)
+    
+    monkeypatch.setattr(models, 'PREDICTOR_BACKEND', 'numpy')
+    monkeypatch.setattr(models, 'select_backend', counted)
+    return calls
+
+def test_deferred_bundles_stay_on_the_reference(verifications, monkeypatch, sector):
+    monkeypatch.setattr(models, 'defer_preparation', True)
+    model_dir, file_config = SECTOR_SOURCES[sector]
+    bundle = build_bundle(sector, model_dir, file_config)
+    
+    assert verifications == []
+    assert not bundle.prepared
+    assert bundle.row_predictor is bundle.reference_predictor
+    assert bundle.backend == {'backend': 'xgboost'}
+
+def test_workers_verify_the_backend_of_loaded_bundles(verifications, monkeypatch, sector):
+    model_dir, file_config = SECTOR_SOURCES[sector]
+    monkeypatch.setattr(models, 'defer_preparation', True)
+    bundle = build_bundle(sector, model_dir, file_config)
+    shadow = build_bundle(sector, model_dir, file_config, serving=False)
+    monkeypatch.setitem(models.bundles, sector, bundle)
+    monkeypatch.setitem(models.shadow_bundles, sector, shadow)
+    monkeypatch.setitem(models.shadow_status, sector, {'state': 'ok', **shadow.describe()})
+    
+    # What gunicorn's post_fork does in each worker
+    monkeypatch.setattr(models, 'defer_preparation', False)
+    prepare_loaded_bundles()
+    
+    assert verifications == ['numpy', 'numpy']
+    for prepared in (models.bundles[sector], models.shadow_bundles[sector]):
+        assert prepared.prepared
+        assert prepared.backend['backend'] == 'numpy'
+    assert models.bundles[sector] is not bundle
+    assert models.shadow_status[sector]['backend']['backend'] == 'numpy'
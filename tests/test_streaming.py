@@ -0,0 +1,48 @@
+"""
+An overloaded sector fails a stream before it starts, or marks the rows it could not score
+"""
+
+import json
+
+import models
+import streaming
+from app import app
+from config import STREAM_CHUNK_SIZE, TIMEOUT
+from conftest import random_records
+
+def overloaded_after(calls, monkeypatch):
+    """Make run_in_sector raise SectorOverloaded once it has run `calls` times"""
+    run = streaming.run_in_sector
+    count = [0]
+    
+    def limited(sector, fn, *args):
+        count[0] += 1
+        if count[0] > calls:
+            raise models.SectorOverloaded(f"Sector '{sector}' is overloaded, retry later")
+        return run(sector, fn, *args)
+    
+    monkeypatch.setattr(streaming, 'run_in_sector', limited)
+
+def upload(sector, records):
+    body = ''.join(json.dumps(record) + '\n' for record in records)
+    return app.test_client().post(
+        f'/api/predict/stream/{sector}', data=body, content_type='application/x-ndjson'
+    )
+
+def test_overload_on_the_first_chunk_is_a_503(sector, monkeypatch):
+    overloaded_after(0, monkeypatch)
+    response = upload(sector, random_records(sector, 10, seed=8))
+    
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(max(1, TIMEOUT))
+
+def test_overload_on_a_later_chunk_becomes_error_rows(sector, monkeypatch):
+    overloaded_after(1, monkeypatch)
+    records = random_records(sector, STREAM_CHUNK_SIZE * 2, seed=9)
+    response = upload(sector, records)
+    
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r['index'] for r in results] == list(range(len(records)))
+    assert all(r['success'] for r in results[:STREAM_CHUNK_SIZE])
+    assert all(not r['success'] and 'overloaded' in r['error'] for r in results[STREAM_CHUNK_SIZE:])
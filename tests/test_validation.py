@@ -0,0 +1,66 @@
+"""
+Batch, sweep and explanation requests accept the same input as a single prediction
+"""
+
+from conftest import random_records
+from explainer import explain_wage_batch
+from models import get_bundle
+from predictor import predict_wage, predict_wage_batch, sweep_wage
+
+def numeric_fields(sector):
+    bundle = get_bundle(sector)
+    return [col for col in bundle.features if col not in bundle.lookups]
+
+def as_strings(record, fields):
+    return {**record, **{col: f' {record[col]} ' for col in fields}}
+
+def test_numeric_strings_are_accepted_everywhere(sector):
+    fields = numeric_fields(sector)
+    records = random_records(sector, 50, seed=4)
+    strings = [as_strings(record, fields) for record in records]
+    
+    expected = [predict_wage(sector, record)[1]['predicted_wage'] for record in records]
+    assert [predict_wage(sector, record)[1]['predicted_wage'] for record in strings] == expected
+    
+    success, batch = predict_wage_batch(sector, strings)
+    assert success and batch['failed'] == 0
+    assert [r['predicted_wage'] for r in batch['results']] == expected
+    
+    success, explained = explain_wage_batch(sector, strings)
+    assert success and explained['failed'] == 0
+    assert [r['predicted_wage'] for r in explained['results']] == expected
+
+def test_sweep_accepts_numeric_strings(sector):
+    field = numeric_fields(sector)[0]
+    record = random_records(sector, 1, seed=5)[0]
+    
+    success, numbers = sweep_wage(sector, record, field, values=[record[field]])
+    assert success
+    success, strings = sweep_wage(sector, record, field, values=[str(record[field])])
+    assert success
+    assert strings['points'][0]['predicted_wage'] == numbers['points'][0]['predicted_wage']
+
+def test_batch_rejects_what_a_single_prediction_rejects(sector):
+    field = numeric_fields(sector)[0]
+    records = random_records(sector, 3, seed=6)
+    records[0][field] = 'not a number'
+    records[1][field] = True
+    
+    single = [predict_wage(sector, record) for record in records]
+    success, batch = predict_wage_batch(sector, records)
+    assert success
+    assert [r['success'] for r in batch['results']] == [ok for ok, _ in single] == [False, False, True]
+    assert [r.get('error') for r in batch['results'][:2]] == [error for _, error in single[:2]]
+
+def test_unknown_sector_gets_the_sector_error():
+    success, error = predict_wage('no-such-sector', {})
+    assert not success
+    assert error.startswith("Sector 'no-such-sector' not available")
+
+def test_batch_reports_missing_fields_like_a_single_prediction(sector):
+    record = random_records(sector, 1, seed=7)[0]
+    partial = {col: value for col, value in record.items() if col not in get_bundle(sector).features[1:]}
+    
+    _, error = predict_wage(sector, partial)
+    _, batch = predict_wage_batch(sector, [partial] * 3)
+    assert [r['error'] for r in batch['results']] == [error] * 3
@@ -2,45 +2,104 @@
 Input validation for predictions
 """
 
-from models import get_encoders, get_features, get_model
+import math
+from config import SWEEP_MAX_POINTS
+from models import available_sectors, get_bundle, get_model
 
-def validate_input(sector, data):
+def validate_sector(sector):
+    """Check if sector model is loaded"""
+    if get_model(sector) is None:
+        available = available_sectors()
+        return False, f"Sector '{sector}' not available. Available: {available}"
+    return True, None
+
+def validate_batch(sector, records, bundle=None):
     """
-    Validate input data against training data.
-    Returns: (is_valid, error_message_or_data)
+    Validate a batch of records column by column, with the same rules as
+    the sector's schema applies to a single record.
+    Returns: (is_valid, error_message_or_row_errors)
+    row_errors holds None for every valid record and an error message otherwise.
     """
-    # Check if model exists
-    if get_model(sector) is None:
-        available = [k for k in ['agriculture', 'construction'] if get_model(k) is not None]
+    bundle = bundle or get_bundle(sector)
+    if bundle is None:
+        available = available_sectors()
         return False, f"Sector '{sector}' model not loaded. Available: {available}"
     
-    # Check for required fields
-    required_fields = get_features(sector)
-    provided_fields = set(data.keys())
-    
-    missing = set(required_fields) - provided_fields
-    if missing:
-        return False, f"Missing required fields: {list(missing)}"
-    
-    # Validate categorical values
-    encoders = get_encoders(sector)
-    categorical_cols = list(encoders.keys())
-    
-    for col in categorical_cols:
-        if col in data:
-            value = data[col]
-            if isinstance(value, str):
-                value = value.strip()
-            
-            valid_values = list(encoders[col].classes_)
-            if value not in valid_values:
-                return False, f"Invalid value '{value}' for field '{col}'. Valid options: {valid_values}"
-    
-    return True, data
+    if not isinstance(records, list):
+        return False, "Records must be a list"
+    
+    schema = bundle.schema
+    required_fields = bundle.features
+    row_errors = [None] * len(records)
+    
+    # Check record shape and required fields
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            row_errors[i] = "Record must be an object"
+            continue
+        missing = [col for col in required_fields if col not in record]
+        if missing:
+            row_errors[i] = f"Missing required fields: {missing}"
+    
+    # Validate one column at a time across the whole batch
+    for col, table, low, high in schema.fields:
+        for i, record in enumerate(records):
+            if row_errors[i] is not None:
+                continue
+            if table is None:
+                is_valid, error = schema.check_number(col, record[col], low, high)
+            else:
+                is_valid, error = schema.check_category(col, record[col], table)
+            if not is_valid:
+                row_errors[i] = error
+    
+    return True, row_errors
 
-def validate_sector(sector):
-    """Check if sector model is loaded"""
-    if get_model(sector) is None:
-        available = [k for k in ['agriculture', 'construction'] if get_model(k) is not None]
-        return False, f"Sector '{sector}' not available. Available: {available}"
-    return True, None
\ No newline at end of file
+def validate_sweep(sector, field, values=None, value_range=None, bundle=None):
+    """
+    Validate the field and values of a what-if sweep. Values are given as a
+    list, or as a numeric range {'start', 'stop', 'step'} including stop.
+    Returns: (is_valid, error_message_or_values)
+    """
+    bundle = bundle or get_bundle(sector)
+    if bundle is None:
+        available = available_sectors()
+        return False, f"Sector '{sector}' model not loaded. Available: {available}"
+    
+    if field not in bundle.features:
+        return False, f"Unknown sweep field '{field}'. Fields: {bundle.features}"
+    
+    table = bundle.lookups.get(field)
+    
+    # Expand a numeric range into its points
+    if value_range is not None:
+        if table is not None:
+            return False, f"Field '{field}' is categorical; give its values as a list"
+        if not isinstance(value_range, dict):
+            return False, "Range must be an object with start, stop and step"
+        bounds = [value_range.get(key) for key in ('start', 'stop', 'step')]
+        if any(isinstance(b, bool) or not isinstance(b, (int, float)) for b in bounds):
+            return False, "Range start, stop and step must be numbers"
+        start, stop, step = bounds
+        if step <= 0 or stop < start:
+            return False, "Range needs start <= stop and a positive step"
+        count = math.floor((stop - start) / step + 1e-9) + 1
+        if count > SWEEP_MAX_POINTS:
+            return False, f"Sweep too large: {count} points (max {SWEEP_MAX_POINTS})"
+        values = [start + i * step for i in range(count)]
+    
+    if not isinstance(values, list) or not values:
+        return False, "Provide a non-empty list of values or a range"
+    
+    if len(values) > SWEEP_MAX_POINTS:
+        return False, f"Sweep too large: {len(values)} points (max {SWEEP_MAX_POINTS})"
+    
+    # Numeric strings are coerced like in a single prediction; other values are kept as given
+    checked = []
+    for value in values:
+        is_valid, result = bundle.schema.check_field(field, value)
+        if not is_valid:
+            return False, result
+        checked.append(result if table is None and isinstance(value, str) else value)
+    
+    return True, checked